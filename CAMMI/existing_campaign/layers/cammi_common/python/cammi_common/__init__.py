@@ -0,0 +1,2 @@
+# Shared clients and helpers for the existing_campaign handlers.
+# Shipped as the cammi-common Lambda layer; importable from /opt/python.
@@ -0,0 +1,48 @@
+import boto3
+from botocore.config import Config
+
+# ---------- AWS Clients ----------
+# Created once per container and shared by every handler that imports them.
+# Keep-alive connections are reused across warm invocations.
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=32,
+    retries={"mode": "adaptive", "max_attempts": 3}
+)
+dynamodb = boto3.resource("dynamodb", config=BOTO_CONFIG)
+s3 = boto3.client("s3", config=BOTO_CONFIG)
+
+_scheduler = None
+
+
+def get_scheduler():
+    """
+    EventBridge Scheduler client, built on first use so cold starts that only
+    answer preflights never pay for it
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = boto3.client("scheduler", config=BOTO_CONFIG)
+    return _scheduler
+
+
+# ---------- S3 Bucket ----------
+S3_BUCKET = "cammi-devprod"
+
+
+# ---------- Warm-up ----------
+def warm_up(*services):
+    """
+    Resolve endpoints and open connections during container init so the first
+    request does not pay for it. Call at module scope with the services the
+    handler uses. Failures are harmless and ignored.
+
+    Only DynamoDB is warmed (describe_endpoints needs no extra IAM action).
+    S3 and the scheduler stay lazy: warming them would add blocking calls to
+    every cold start, including ones that only answer preflights.
+    """
+    if "dynamodb" in services:
+        try:
+            dynamodb.meta.client.describe_endpoints()
+        except Exception:
+            pass
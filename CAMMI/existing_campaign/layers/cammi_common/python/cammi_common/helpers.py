@@ -0,0 +1,168 @@
+import io
+import json
+import base64
+import secrets
+from threading import BoundedSemaphore
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timezone, timedelta
+from boto3.dynamodb.types import TypeSerializer
+from boto3.s3.transfer import TransferConfig
+
+from cammi_common.clients import s3, S3_BUCKET
+
+try:
+    import orjson  # faster parse/serialize when the layer provides it
+except ImportError:
+    orjson = None
+
+try:
+    from PIL import Image, ImageOps  # provided by the pdf-libraries layer
+except ImportError:
+    Image = ImageOps = None
+
+
+# ---------- JSON ----------
+def json_loads(raw):
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def json_dumps(obj):
+    if orjson:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, separators=(",", ":"), default=str)
+
+
+def parse_body(event):
+    # Proxy integration: JSON string (or bytes); direct invokes and test
+    # events may carry the body as a dict already; events without a body
+    # are used as-is
+    raw = event.get("body")
+    if isinstance(raw, (str, bytes)) and raw:
+        return json_loads(raw)
+    if isinstance(raw, dict):
+        return raw
+    return event
+
+
+# ---------- Timezone ----------
+PKT_OFFSET = timedelta(hours=5)
+PKT = timezone(PKT_OFFSET)  # Pakistan Time +05:00
+
+
+# ---------- Transactions ----------
+serializer = TypeSerializer()
+
+
+def to_dynamo(values):
+    return {k: serializer.serialize(v) for k, v in values.items()}
+
+
+# ---------- Worker pool ----------
+# Created once per container and shared by S3 uploads and DynamoDB writes;
+# the calls are I/O bound and boto3 clients are thread-safe
+executor = ThreadPoolExecutor(max_workers=8)
+
+
+# ---------- Images ----------
+MAX_IMAGE_SIDE = 2048
+JPEG_QUALITY = 85
+EXIF_ORIENTATION = 0x0112
+
+# Decoding is the memory-heavy step (a 12 MP photo is ~36-48 MB of pixels),
+# so only a couple of images are recompressed at once while the uploads
+# themselves stay parallel; anything larger than MAX_RECOMPRESS_PIXELS is
+# uploaded as-is rather than decoded
+MAX_RECOMPRESS_PIXELS = 24_000_000
+_decode_slots = BoundedSemaphore(2)
+
+# Objects above the threshold go up as parallel multipart parts; smaller
+# ones are still sent as a single PUT
+UPLOAD_CONFIG = TransferConfig(
+    multipart_threshold=8 << 20,
+    multipart_chunksize=5 << 20,
+    max_concurrency=4,
+    use_threads=True
+)
+
+
+def _has_transparency(im):
+    return im.mode in ("RGBA", "LA", "PA", "RGBa", "La") or "transparency" in im.info
+
+
+def compress_image(image_bytes):
+    """
+    Re-encode an uploaded image as a bounded-size progressive JPEG.
+    Phone PNGs shrink by several times; the original bytes are kept when
+    Pillow is unavailable, the data is not an image, the image has
+    transparency (JPEG would turn it black), or re-encoding does not make
+    it smaller. EXIF orientation is applied to the pixels first, since the
+    JPEG is written without EXIF.
+    Very large images are uploaded unchanged to bound memory use.
+    """
+    if Image is None:
+        return image_bytes
+    try:
+        with _decode_slots, Image.open(io.BytesIO(image_bytes)) as im:
+            # Header-only so far: size and mode are known without decoding
+            if _has_transparency(im) or im.width * im.height > MAX_RECOMPRESS_PIXELS:
+                return image_bytes
+            # JPEGs can decode straight at a reduced scale
+            im.draft("RGB", (MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+            if im.getexif().get(EXIF_ORIENTATION, 1) != 1:
+                im = ImageOps.exif_transpose(im)
+            im.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+            buf = io.BytesIO()
+            im.convert("RGB").save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    except Exception:
+        return image_bytes
+
+    compressed = buf.getvalue()
+    return compressed if len(compressed) < len(image_bytes) else image_bytes
+
+
+def _put_image(upload):
+    # Decoding inside the worker keeps at most max_workers base64 payloads in
+    # memory; pixel decoding is further limited by _decode_slots
+    key, img_b64 = upload
+    s3.upload_fileobj(
+        io.BytesIO(compress_image(base64.b64decode(img_b64))),
+        S3_BUCKET,
+        key,
+        ExtraArgs={"ContentType": "image/jpeg"},
+        Config=UPLOAD_CONFIG
+    )
+
+
+def upload_images_parallel(images, name_prefix=""):
+    """
+    Upload base64 images (plain or data URLs) to S3 in parallel and return
+    their keys in request order
+    """
+    uploads = []
+    # One random prefix per request; the index keeps keys unique
+    token = secrets.token_hex(16)
+    for idx, img_b64 in enumerate(images):
+        if "," in img_b64:
+            img_b64 = img_b64.split(",", 1)[1]
+        uploads.append((f"images/{name_prefix}{token}_{idx}.jpg", img_b64))
+
+    list(executor.map(_put_image, uploads))
+    return [key for key, _ in uploads]
+
+
+# ---------- Response ----------
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "OPTIONS,PUT,GET,POST",
+    "Access-Control-Allow-Headers": "Content-Type,Authorization"
+}
+
+
+def cors_response(status_code, body):
+    """Standard API Gateway response with CORS"""
+    return {
+        "statusCode": status_code,
+        "headers": CORS_HEADERS,
+        "body": json_dumps(body)
+    }
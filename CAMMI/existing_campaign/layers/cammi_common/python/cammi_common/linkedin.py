@@ -0,0 +1,26 @@
+import time
+
+from cammi_common.tables import linkedin_user_table
+
+# ---------- LinkedIn User Cache ----------
+# Warm containers reuse the linkedin-user-table record instead of re-reading it
+# on every publish. Entries expire after USER_CACHE_TTL seconds and are dropped
+# as soon as LinkedIn rejects the cached token.
+USER_CACHE_TTL = 300
+_user_cache = {}
+
+
+def get_linkedin_user(sub):
+    cached = _user_cache.get(sub)
+    if cached and cached[0] > time.time():
+        return cached[1]
+
+    user = linkedin_user_table.get_item(Key={"sub": sub}).get("Item")
+    if user:
+        _user_cache[sub] = (time.time() + USER_CACHE_TTL, user)
+    return user
+
+
+def forget_linkedin_user(sub, status):
+    if status == 401:
+        _user_cache.pop(sub, None)
@@ -0,0 +1,14 @@
+from cammi_common.clients import dynamodb
+
+# ---------- Tables ----------
+# Table resources are built once per container and shared by every handler
+# that imports them
+POSTS_TABLE = "posts-table"
+LINKEDIN_TABLE = "linkedin-posts-table"
+CAMPAIGNS_TABLE = "user-campaigns"
+LINKEDIN_USER_TABLE = "linkedin-user-table"
+
+posts_table = dynamodb.Table(POSTS_TABLE)
+linkedin_table = dynamodb.Table(LINKEDIN_TABLE)
+campaigns_table = dynamodb.Table(CAMPAIGNS_TABLE)
+linkedin_user_table = dynamodb.Table(LINKEDIN_USER_TABLE)
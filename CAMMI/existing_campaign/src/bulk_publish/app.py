@@ -97,7 +97,7 @@ def lambda_handler(event, context):
         )
 
         # ---------- EventBridge Schedule ----------
-        schedule_name = f"linkedin_post_{sub}_{post_id}_{int(datetime.utcnow().timestamp())}"
+        schedule_name = f"linkedin_post_{sub}_{post_id}_{time.time_ns() // 1_000_000_000}"
 
         scheduler.create_schedule(
             Name=schedule_name,
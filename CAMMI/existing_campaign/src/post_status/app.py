@@ -27,6 +27,8 @@ USER_CAMPAIGNS_TABLE = "user-campaigns"
 POSTS_CAMPAIGN_GSI = "campaign_id-index"
 LINKEDIN_CAMPAIGN_GSI = "campaign_id-index"
 
+CAMPAIGN_ID_KEY = Key("campaign_id")
+
 posts_table = dynamodb.Table(POSTS_TABLE)
 linkedin_table = dynamodb.Table(LINKEDIN_TABLE)
 user_campaigns_table = dynamodb.Table(USER_CAMPAIGNS_TABLE)
@@ -54,35 +56,52 @@ def download_and_base64(image_key: str):
 
 def attach_images(items):
     for item in items:
-        image_keys = item.get("image_keys")
-
-        if image_keys and isinstance(image_keys, list):
-            base64_images = []
-
-            for key in image_keys:
-                encoded = download_and_base64(key)
-                if encoded:
-                    base64_images.append(encoded)
+        # DynamoDB "L" attributes always deserialize to a list
+        image_keys = item.get("image_keys") or ()
+        encoded = list(filter(None, map(download_and_base64, image_keys)))
 
-            if base64_images:
-                item["image_base64"] = base64_images
+        if encoded:
+            item["image_base64"] = encoded
 
     return items
 
 
 # ---------- NORMALIZATION ----------
-def normalize_linkedin_post(item):
-    message = item.get("message", "")
-    parts = [p.strip() for p in message.split("\n\n") if p.strip()]
+_PARAGRAPH_SEP = "\n\n"
+
+
+def _first_two_paragraphs(message):
+    # Walks the message with str.find and stops after the second non-empty
+    # paragraph instead of splitting the whole message into a list.
+    found = []
+    start = 0
+    while len(found) < 2:
+        end = message.find(_PARAGRAPH_SEP, start)
+        part = (message[start:] if end < 0 else message[start:end]).strip()
+        if part:
+            found.append(part)
+        if end < 0:
+            break
+        start = end + 2
 
-    item["title"] = item.get("title") or (parts[0] if len(parts) > 0 else "")
-    item["description"] = item.get("description") or (parts[1] if len(parts) > 1 else "")
+    while len(found) < 2:
+        found.append("")
+    return found
 
-    hashtag_str = item.get("hashtag", "")
-    item["hashtags"] = hashtag_str.split() if hashtag_str else []
 
-    item.pop("message", None)
-    item.pop("hashtag", None)
+def normalize_linkedin_post(item):
+    pop = item.pop
+    message = pop("message", None) or ""
+    hashtag_str = pop("hashtag", None) or ""
+
+    title = item.get("title")
+    description = item.get("description")
+    if not (title and description):
+        first, second = _first_two_paragraphs(message)
+        item["title"] = title or first
+        item["description"] = description or second
+
+    item["hashtags"] = hashtag_str.split()
 
     return item
 
@@ -96,9 +115,11 @@ def lambda_handler(event, context):
         if not campaign_id:
             return response(400, {"error": "campaign_id is required"})
 
+        campaign_condition = CAMPAIGN_ID_KEY.eq(campaign_id)
+
         # ---------- USER CAMPAIGNS ----------
         user_campaigns_result = user_campaigns_table.query(
-            KeyConditionExpression=Key("campaign_id").eq(campaign_id)
+            KeyConditionExpression=campaign_condition
         )
 
         campaign_projects = user_campaigns_result.get("Items", [])
@@ -106,7 +127,7 @@ def lambda_handler(event, context):
         # ---------- DRAFT POSTS ----------
         posts_result = posts_table.query(
             IndexName=POSTS_CAMPAIGN_GSI,
-            KeyConditionExpression=Key("campaign_id").eq(campaign_id)
+            KeyConditionExpression=campaign_condition
         )
 
         draft_posts = [
@@ -119,7 +140,7 @@ def lambda_handler(event, context):
         # ---------- LINKEDIN POSTS ----------
         linkedin_result = linkedin_table.query(
             IndexName=LINKEDIN_CAMPAIGN_GSI,
-            KeyConditionExpression=Key("campaign_id").eq(campaign_id)
+            KeyConditionExpression=campaign_condition
         )
 
         linkedin_posts = [
@@ -147,14 +168,17 @@ def lambda_handler(event, context):
 
 
 # ---------- RESPONSE ----------
+RESPONSE_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type,Authorization",
+    "Access-Control-Allow-Methods": "OPTIONS,POST,GET"
+}
+
+
 def response(status_code, body):
     return {
         "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type,Authorization",
-            "Access-Control-Allow-Methods": "OPTIONS,POST,GET"
-        },
+        "headers": RESPONSE_HEADERS,
         "body": json.dumps(decimal_to_native(body))
     }
@@ -8,20 +8,59 @@ import uuid
 from datetime import timedelta, timezone
 from boto3.dynamodb.conditions import Key
 
+from cammi_common.linkedin import get_linkedin_user, forget_linkedin_user
+
 # ---------- AWS Clients ----------
 dynamodb = boto3.resource("dynamodb")
 s3 = boto3.client("s3")
-http = urllib3.PoolManager()
+http = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=16,
+    block=False,
+    retries=urllib3.Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False
+    ),
+    headers={"Connection": "keep-alive"}
+)
 
 # ---------- Tables / Bucket ----------
 POSTS_TABLE = "posts-table"
 LINKEDIN_TABLE = "linkedin-posts-table"
-USER_TABLE = "linkedin-user-table"
 IMAGE_BUCKET = "cammi-devprod"
 
 posts_table = dynamodb.Table(POSTS_TABLE)
 linkedin_table = dynamodb.Table(LINKEDIN_TABLE)
-user_table = dynamodb.Table(USER_TABLE)
+
+
+def stored_image_keys(post_id, campaign_id):
+    """S3 keys currently recorded on the post (dict or plain-string entries)"""
+    item = posts_table.get_item(
+        Key={"post_id": post_id, "campaign_id": campaign_id},
+        ProjectionExpression="image_keys"
+    ).get("Item") or {}
+    return {
+        k["s3_key"] if isinstance(k, dict) else k
+        for k in item.get("image_keys") or []
+    }
+
+
+def is_post_image_key(key, post_id, stored_keys):
+    # Client-supplied keys may only point at this post's own images
+    return bool(key) and (key in stored_keys or key.startswith(f"images/{post_id}/"))
+
+
+def reuse_s3_image(s3_uri, post_id, stored_keys):
+    """
+    Key for an s3://bucket/key reference, or None when it is not one of this
+    post's images in IMAGE_BUCKET (other buckets are never read)
+    """
+    src_bucket, _, src_key = s3_uri[len("s3://"):].partition("/")
+    if src_bucket != IMAGE_BUCKET or not is_post_image_key(src_key, post_id, stored_keys):
+        return None
+    return src_key
 
 
 def normalize_hashtags(raw):
@@ -71,10 +110,43 @@ def lambda_handler(event, context):
         images = body.get("images", [])
 
         # ---------- Upload Images to S3 ----------
+        # images: [{"kind": "existing", "s3_key": ...} | {"kind": "new", "data_url": ...}]
+        # Plain base64 strings are still accepted as new images.
         image_keys = []
-        for img_b64 in images:
+        stored_keys = None  # the post's current image keys, read on first use
+        for img in images:
+            if not img:
+                continue
+
+            if isinstance(img, dict):
+                if img.get("kind") == "existing":
+                    # Already in S3 (caption-only edit) - keep the key, skip decode + upload
+                    s3_key = img.get("s3_key")
+                    if s3_key:
+                        if stored_keys is None:
+                            stored_keys = stored_image_keys(post_id, campaign_id)
+                        if not is_post_image_key(s3_key, post_id, stored_keys):
+                            return response(400, f"Image key does not belong to this post: {s3_key}")
+                        image_keys.append({"s3_key": s3_key})
+                    continue
+                img_b64 = img.get("data_url")
+            else:
+                img_b64 = img
+
             if not img_b64:
                 continue
+
+            # s3://bucket/key references to this post's images are reused
+            # instead of round-tripping the bytes through base64.
+            if img_b64.startswith("s3://"):
+                if stored_keys is None:
+                    stored_keys = stored_image_keys(post_id, campaign_id)
+                s3_key = reuse_s3_image(img_b64, post_id, stored_keys)
+                if not s3_key:
+                    return response(400, f"Image reference does not belong to this post: {img_b64}")
+                image_keys.append({"s3_key": s3_key})
+                continue
+
             if "," in img_b64:
                 img_b64 = img_b64.split(",", 1)[1]
             image_bytes = base64.b64decode(img_b64)
@@ -139,11 +211,10 @@ def lambda_handler(event, context):
         current_time = datetime.datetime.now(tz_plus_5).isoformat()
 
         # ---------- Fetch LinkedIn User ----------
-        user_resp = user_table.get_item(Key={"sub": sub})
-        if "Item" not in user_resp:
+        user = get_linkedin_user(sub)
+        if not user:
             return response(404, "LinkedIn user not found")
 
-        user = user_resp["Item"]
         access_token = user.get("access_token")
         linkedin_member_id = user.get("linkedin_member_id", sub)
 
@@ -178,6 +249,7 @@ def lambda_handler(event, context):
             )
 
             if reg_res.status not in [200, 201]:
+                forget_linkedin_user(sub, reg_res.status)
                 raise Exception(f"LinkedIn registerUpload failed: {reg_res.status} {reg_res.data.decode()}")
 
             reg_data = json.loads(reg_res.data.decode())
@@ -193,6 +265,7 @@ def lambda_handler(event, context):
             )
 
             if put_res.status not in [200, 201]:
+                forget_linkedin_user(sub, put_res.status)
                 raise Exception(f"LinkedIn image upload failed: {put_res.status} {put_res.data.decode()}")
 
             # Optional: wait for LinkedIn to process image
@@ -224,6 +297,7 @@ def lambda_handler(event, context):
         )
 
         if post_res.status not in [200, 201]:
+            forget_linkedin_user(sub, post_res.status)
             raise Exception(f"LinkedIn post failed: {post_res.status} {post_res.data.decode()}")
 
         post_data = json.loads(post_res.data.decode())
@@ -7,18 +7,29 @@ import datetime
 from datetime import timedelta, timezone
 from boto3.dynamodb.conditions import Key
 
+from cammi_common.linkedin import get_linkedin_user, forget_linkedin_user
+
 # ---------- AWS Clients ----------
 dynamodb = boto3.resource("dynamodb")
-http = urllib3.PoolManager()
+http = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=16,
+    block=False,
+    retries=urllib3.Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False
+    ),
+    headers={"Connection": "keep-alive"}
+)
 
 # ---------- Tables ----------
 POSTS_TABLE = "posts-table"
 LINKEDIN_TABLE = "linkedin-posts-table"
-USER_TABLE = "linkedin-user-table"
 
 posts_table = dynamodb.Table(POSTS_TABLE)
 linkedin_table = dynamodb.Table(LINKEDIN_TABLE)
-user_table = dynamodb.Table(USER_TABLE)
 
 
 def normalize_hashtags(raw):
@@ -110,11 +121,10 @@ def lambda_handler(event, context):
         )
 
         # ---------- Fetch LinkedIn User ----------
-        user_resp = user_table.get_item(Key={"sub": sub})
-        if "Item" not in user_resp:
+        user = get_linkedin_user(sub)
+        if not user:
             return response(404, "LinkedIn user not found")
 
-        user = user_resp["Item"]
         access_token = user.get("access_token")
         linkedin_member_id = user.get("linkedin_member_id", sub)
 
@@ -161,6 +171,7 @@ def lambda_handler(event, context):
             )
 
             if reg_res.status != 200:
+                forget_linkedin_user(sub, reg_res.status)
                 return response(500, "Image registration failed")
 
             reg_data = json.loads(reg_res.data.decode())
@@ -180,6 +191,7 @@ def lambda_handler(event, context):
             )
 
             if upload_res.status not in (200, 201, 202):
+                forget_linkedin_user(sub, upload_res.status)
                 return response(500, "Image upload failed")
 
             uploaded_assets.append({
@@ -228,6 +240,7 @@ def lambda_handler(event, context):
         )
 
         if post_res.status != 201:
+            forget_linkedin_user(sub, post_res.status)
             return response(500, post_res.data.decode())
 
         post_urn = json.loads(post_res.data.decode()).get("id")
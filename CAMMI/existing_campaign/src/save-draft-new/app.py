@@ -1,24 +1,24 @@
 import json
-import boto3
-import base64
-import uuid
-from datetime import datetime, timezone, timedelta
+from datetime import datetime
 from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 
-# ---------- AWS Clients ----------
-dynamodb = boto3.resource("dynamodb")
-s3 = boto3.client("s3")
+from cammi_common import clients
+from cammi_common.tables import posts_table as table
+from cammi_common.helpers import PKT, parse_body, upload_images_parallel, cors_response as _response
 
-# ---------- Tables ----------
-POSTS_TABLE = "posts-table"
-table = dynamodb.Table(POSTS_TABLE)
+# ---------- Update expression ----------
+UPDATE_EXPR = (
+    "SET #s = :draft, scheduled_time = :scheduled, "
+    "#t = :title, description = :desc, hashtags = :tags, image_keys = :images"
+)
+EXPR_ATTR_NAMES = {
+    "#s": "status",  # reserved keyword workaround
+    "#t": "title"
+}
 
-# ---------- S3 Bucket ----------
-S3_BUCKET = "cammi-devprod"  # <-- replace with your S3 bucket name
-
-# ---------- Timezone ----------
-PKT = timezone(timedelta(hours=5))  # Pakistan Time +05:00
+# ---------- Warm-up ----------
+clients.warm_up("dynamodb")
 
 
 def lambda_handler(event, context):
@@ -27,18 +27,13 @@ def lambda_handler(event, context):
 
         # CORS preflight
         if event.get("httpMethod") == "OPTIONS":
-            return _response(200, {"message": "CORS preflight"})
+            return CORS_PREFLIGHT
 
-        # Parse body
-        body = event.get("body")
-        if body and isinstance(body, str):
-            body = json.loads(body)
-        elif not body:
-            body = event
+        body = parse_body(event)
 
         # Mandatory fields
-        post_id = body.get("post_id")
-        scheduled_time_input = body.get("scheduled_time")
+        _get = body.get
+        post_id, scheduled_time_input = _get("post_id"), _get("scheduled_time")
 
         if not post_id:
             return _response(400, {"error": "post_id is required"})
@@ -46,21 +41,15 @@ def lambda_handler(event, context):
             return _response(400, {"error": "scheduled_time is required"})
 
         # Optional fields: if not provided, set to None (will be null in DynamoDB)
-        title = body.get("title") if "title" in body else None
-        description = body.get("description") if "description" in body else None
-        hashtags = body.get("hashtags") if "hashtags" in body else None
-        images = body.get("images") if "images" in body else None
-
-        # ---------- Step 1: Query the post ----------
-        response = table.query(
-            KeyConditionExpression=Key("post_id").eq(post_id),
-            Limit=1
+        title, description, hashtags, images = (
+            _get("title"), _get("description"), _get("hashtags"), _get("images")
         )
-        items = response.get("Items", [])
-        if not items:
+
+        # ---------- Step 1: Fetch the post ----------
+        post = _fetch_post(post_id, _get("campaign_id"))
+        if not post:
             return _response(404, {"message": "Post not found", "post_id": post_id})
 
-        post = items[0]
         campaign_id = post["campaign_id"]
 
         # ---------- Step 2: Handle scheduled_time ----------
@@ -70,26 +59,13 @@ def lambda_handler(event, context):
         scheduled_time_str = scheduled_dt.isoformat()
 
         # ---------- Step 3: Handle images ----------
-        image_keys = []
         if images:
-            for idx, img_b64 in enumerate(images):
-                img_data = base64.b64decode(img_b64)
-                if "," in img_b64:
-                    img_b64 = img_b64.split(",")[1]
-
-                img_data = base64.b64decode(img_b64)
-                filename = f"images/{post_id}_{uuid.uuid4().hex}_{idx}.jpg"
-                s3.put_object(Bucket=S3_BUCKET, Key=filename, Body=img_data, ContentType="image/jpeg")
-                image_keys.append(filename)
+            # Upload in parallel; keys keep the request order
+            image_keys = upload_images_parallel(images, name_prefix=f"{post_id}_")
         else:
             image_keys = None  # explicitly set null if no images
 
-        # ---------- Step 4: Build update expression ----------
-        update_expr = (
-            "SET #s = :draft, scheduled_time = :scheduled, "
-            "#t = :title, description = :desc, hashtags = :tags, image_keys = :images"
-        )
-
+        # ---------- Step 4: Build update values ----------
         expr_attr_values = {
             ":draft": "draft",
             ":scheduled": scheduled_time_str,
@@ -99,16 +75,11 @@ def lambda_handler(event, context):
             ":images": image_keys
         }
 
-        expr_attr_names = {
-            "#s": "status",  # reserved keyword workaround
-            "#t": "title"
-        }
-
         # ---------- Step 5: Update DynamoDB ----------
         table.update_item(
             Key={"post_id": post_id, "campaign_id": campaign_id},
-            UpdateExpression=update_expr,
-            ExpressionAttributeNames=expr_attr_names,
+            UpdateExpression=UPDATE_EXPR,
+            ExpressionAttributeNames=EXPR_ATTR_NAMES,
             ExpressionAttributeValues=expr_attr_values
         )
 
@@ -130,14 +101,23 @@ def lambda_handler(event, context):
         return _response(500, {"error": "Internal server error", "details": str(e)})
 
 
-def _response(status_code, body):
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "OPTIONS,PUT,GET,POST",
-            "Access-Control-Allow-Headers": "Content-Type,Authorization"
-        },
-        "body": json.dumps(body)
-    }
+def _fetch_post(post_id, campaign_id=None):
+    """Direct get_item when the full key is known, otherwise query by post_id"""
+    if campaign_id:
+        response = table.get_item(
+            Key={"post_id": post_id, "campaign_id": campaign_id},
+            ProjectionExpression="campaign_id"
+        )
+        return response.get("Item")
+
+    response = table.query(
+        KeyConditionExpression=Key("post_id").eq(post_id),
+        ProjectionExpression="campaign_id",
+        Limit=1
+    )
+    items = response.get("Items", [])
+    return items[0] if items else None
+
+
+# Preflight responses are identical on every call
+CORS_PREFLIGHT = _response(200, {"message": "CORS preflight"})
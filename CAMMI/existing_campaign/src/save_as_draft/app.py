@@ -1,14 +1,17 @@
 import json
-import boto3
-from boto3.dynamodb.conditions import Key
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Key, Attr
 from botocore.exceptions import ClientError
 
-# DynamoDB
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table("posts-table")
+from cammi_common import clients
+from cammi_common.tables import posts_table as table
+from cammi_common.helpers import parse_body, cors_response as _response
 
 GSI_NAME = "campaign_id-index"
 
+# ---------- Warm-up ----------
+clients.warm_up("dynamodb")
+
 
 def lambda_handler(event, context):
     """
@@ -20,27 +23,19 @@ def lambda_handler(event, context):
 
         # Handle CORS preflight (OPTIONS)
         if event.get("httpMethod") == "OPTIONS":
-            return _response(200, {"message": "CORS preflight"})
-
-        # Extract body (API Gateway / Lambda console safe)
-        body = event.get("body")
+            return CORS_PREFLIGHT
 
-        if body:
-            if isinstance(body, str):
-                body = json.loads(body)
-        else:
-            # Lambda console fallback
-            body = event
+        body = parse_body(event)
 
         campaign_id = body.get("campaign_id")
 
         if not campaign_id:
             return _response(400, {"error": "campaign_id is required"})
 
-        # Query posts
-        posts = _query_posts_by_campaign(campaign_id)
+        # Query "Generated" posts (filtered server-side)
+        posts, scanned_count = _query_posts_by_campaign(campaign_id)
 
-        if not posts:
+        if not scanned_count:
             return _response(
                 404,
                 {
@@ -50,23 +45,14 @@ def lambda_handler(event, context):
             )
 
         # Update only posts with status "Generated"
-        updated_posts = 0
-        for post in posts:
-            if post.get("status") == "Generated":
-                table.update_item(
-                    Key={
-                        "post_id": post["post_id"],
-                        "campaign_id": post["campaign_id"]
-                    },
-                    UpdateExpression="SET #status = :draft",
-                    ExpressionAttributeNames={
-                        "#status": "status"
-                    },
-                    ExpressionAttributeValues={
-                        ":draft": "draft"
-                    }
-                )
-                updated_posts += 1
+        targets = [(post["post_id"], post["campaign_id"]) for post in posts]
+
+        # UpdateItem cannot be batched, so run the updates concurrently
+        if targets:
+            with ThreadPoolExecutor(max_workers=min(16, len(targets))) as executor:
+                list(executor.map(_set_draft, targets))
+
+        updated_posts = len(targets)
 
         return _response(
             200,
@@ -100,14 +86,20 @@ def lambda_handler(event, context):
 
 
 def _query_posts_by_campaign(campaign_id):
-    """Query DynamoDB GSI with pagination"""
+    """
+    Query DynamoDB GSI with pagination, returning only "Generated" posts
+    (keys only) plus the number of posts read before filtering
+    """
     items = []
+    scanned_count = 0
     last_evaluated_key = None
 
     while True:
         params = {
             "IndexName": GSI_NAME,
-            "KeyConditionExpression": Key("campaign_id").eq(campaign_id)
+            "KeyConditionExpression": Key("campaign_id").eq(campaign_id),
+            "FilterExpression": Attr("status").eq("Generated"),
+            "ProjectionExpression": "post_id, campaign_id"
         }
 
         if last_evaluated_key:
@@ -115,23 +107,31 @@ def _query_posts_by_campaign(campaign_id):
 
         response = table.query(**params)
         items.extend(response.get("Items", []))
+        scanned_count += response.get("ScannedCount", 0)
 
         last_evaluated_key = response.get("LastEvaluatedKey")
         if not last_evaluated_key:
             break
 
-    return items
+    return items, scanned_count
 
 
-def _response(status_code, body):
-    """Standard API Gateway response with CORS"""
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "OPTIONS,PUT,GET,POST",
-            "Access-Control-Allow-Headers": "Content-Type,Authorization"
+def _set_draft(target):
+    post_id, campaign_id = target
+    table.update_item(
+        Key={
+            "post_id": post_id,
+            "campaign_id": campaign_id
+        },
+        UpdateExpression="SET #status = :draft",
+        ExpressionAttributeNames={
+            "#status": "status"
         },
-        "body": json.dumps(body)
-    }
+        ExpressionAttributeValues={
+            ":draft": "draft"
+        }
+    )
+
+
+# Preflight responses are identical on every call
+CORS_PREFLIGHT = _response(200, {"message": "CORS preflight"})
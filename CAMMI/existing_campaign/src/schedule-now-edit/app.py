@@ -1,57 +1,107 @@
-import json
-import boto3
-import base64
 import uuid
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 from boto3.dynamodb.conditions import Key
 
-# ---------- AWS clients ----------
-dynamodb = boto3.resource("dynamodb")
-s3 = boto3.client("s3")
-scheduler = boto3.client("scheduler")
+from cammi_common import clients
+from cammi_common.tables import POSTS_TABLE, LINKEDIN_TABLE, posts_table
+from cammi_common.helpers import (
+    PKT, to_dynamo, json_dumps, parse_body, upload_images_parallel,
+    cors_response as response
+)
 
 # ---------- Constants ----------
-POSTS_TABLE = "posts-table"
-LINKEDIN_TABLE = "linkedin-posts-table"
-S3_BUCKET = "cammi-devprod"
-
 STATUS_LAMBDA_ARN = "arn:aws:lambda:us-east-1:687088702813:function:status"
 EVENTBRIDGE_ROLE_ARN = "arn:aws:iam::687088702813:role/scheduler-invoke-lambda-role"
 
-PKT = timezone(timedelta(hours=5))
-
-# ---------- Tables ----------
-posts_table = dynamodb.Table(POSTS_TABLE)
-linkedin_table = dynamodb.Table(LINKEDIN_TABLE)
+SCHEDULE_UPDATE_EXPR = """
+    SET scheduled_time = :st,
+        #status = :status,
+        title = :title,
+        description = :desc,
+        hashtags = :tags,
+        image_keys = :imgs
+"""
+STATUS_ATTR_NAMES = {"#status": "status"}
+
+# ---------- Warm-up ----------
+# The scheduler client is created lazily on the first non-OPTIONS request
+clients.warm_up("dynamodb")
+
+
+def fetch_post(post_id, campaign_id=None):
+    # Direct get_item when the full key is known, otherwise query by post_id
+    if campaign_id:
+        return posts_table.get_item(
+            Key={"post_id": post_id, "campaign_id": campaign_id},
+            ProjectionExpression="campaign_id, image_keys"
+        ).get("Item")
+
+    items = posts_table.query(
+        KeyConditionExpression=Key("post_id").eq(post_id),
+        ProjectionExpression="campaign_id, image_keys",
+        Limit=1
+    )["Items"]
+    return items[0] if items else None
+
+
+def write_schedule_records(post_id, campaign_id, sub, scheduled_time_str, title,
+                           description, hashtags, image_keys, message):
+    """Update posts-table and insert linkedin-posts-table in one transaction"""
+    clients.dynamodb.meta.client.transact_write_items(TransactItems=[
+        {
+            "Update": {
+                "TableName": POSTS_TABLE,
+                "Key": to_dynamo({"post_id": post_id, "campaign_id": campaign_id}),
+                "UpdateExpression": SCHEDULE_UPDATE_EXPR,
+                "ExpressionAttributeNames": STATUS_ATTR_NAMES,
+                "ExpressionAttributeValues": to_dynamo({
+                    ":st": scheduled_time_str,
+                    ":status": "scheduled",
+                    ":title": title,
+                    ":desc": description,
+                    ":tags": hashtags,
+                    ":imgs": image_keys
+                })
+            }
+        },
+        {
+            "Put": {
+                "TableName": LINKEDIN_TABLE,
+                "Item": to_dynamo({
+                    "sub": sub,
+                    "post_time": scheduled_time_str,
+                    "post_id": post_id,
+                    "campaign_id": campaign_id,
+                    "scheduled_time": scheduled_time_str,
+                    "message": message,
+                    "image_keys": image_keys,
+                    "status": "scheduled"
+                })
+            }
+        }
+    ])
 
 
 def lambda_handler(event, context):
     try:
         # ---------- CORS ----------
         if event.get("httpMethod") == "OPTIONS":
-            return response(200, {})
+            return CORS_PREFLIGHT
 
-        # ---------- Robust body parsing ----------
-        if "body" in event:
-            body = event["body"]
-            if isinstance(body, str):
-                body = json.loads(body)
-        else:
-            body = event
+        # ---------- Body parsing ----------
+        body = parse_body(event)
 
         # ---------- Required fields ----------
-        post_id = body.get("post_id")
-        sub = body.get("sub")
-        scheduled_time_input = body.get("scheduled_time")
+        _get = body.get
+        post_id, sub, scheduled_time_input = _get("post_id"), _get("sub"), _get("scheduled_time")
 
         if not post_id or not sub or not scheduled_time_input:
             return response(400, "post_id, sub, and scheduled_time are required")
 
         # ---------- Optional fields ----------
-        title = body.get("title", "")
-        description = body.get("description", "")
-        hashtags = body.get("hashtags") or body.get("hashtag") or ""
-        images = body.get("images")
+        title, description = _get("title", ""), _get("description", "")
+        hashtags = _get("hashtags") or _get("hashtag") or ""
+        images = _get("images")
 
         # ---------- 🔧 HASHTAGS FIX (ONLY CHANGE) ----------
         if isinstance(hashtags, list):
@@ -72,83 +122,31 @@ def lambda_handler(event, context):
         scheduled_time_str = scheduled_dt.isoformat()
 
         # ---------- Fetch post ----------
-        query_resp = posts_table.query(
-            KeyConditionExpression=Key("post_id").eq(post_id)
-        )
+        post_item = fetch_post(post_id, _get("campaign_id"))
 
-        if not query_resp["Items"]:
+        if not post_item:
             return response(404, "Post not found")
 
-        post_item = query_resp["Items"][0]
         campaign_id = post_item["campaign_id"]
 
         # ---------- Image handling ----------
         image_keys = post_item.get("image_keys", [])
 
         if images is not None:
-            image_keys = []
-            for img in images:
-                if "," in img:
-                    img = img.split(",", 1)[1]
-
-                image_bytes = base64.b64decode(img)
-                key = f"images/{uuid.uuid4().hex}.jpg"
-
-                s3.put_object(
-                    Bucket=S3_BUCKET,
-                    Key=key,
-                    Body=image_bytes,
-                    ContentType="image/jpeg"
-                )
-
-                image_keys.append(key)
+            # Upload in parallel; keys keep the request order
+            image_keys = upload_images_parallel(images)
 
         # ---------- Build message ----------
         message = f"{title}\n\n{description}\n\n{hashtags}"
 
-        # ---------- Update posts-table ----------
-        posts_table.update_item(
-            Key={"post_id": post_id, "campaign_id": campaign_id},
-            UpdateExpression="""
-                SET scheduled_time = :st,
-                    #status = :status,
-                    title = :title,
-                    description = :desc,
-                    hashtags = :tags,
-                    image_keys = :imgs
-            """,
-            ExpressionAttributeNames={"#status": "status"},
-            ExpressionAttributeValues={
-                ":st": scheduled_time_str,
-                ":status": "scheduled",
-                ":title": title,
-                ":desc": description,
-                ":tags": hashtags,
-                ":imgs": image_keys
-            }
-        )
-
-        # ---------- Insert linkedin-posts-table ----------
-        linkedin_table.put_item(
-            Item={
-                "sub": sub,
-                "post_time": scheduled_time_str,
-                "post_id": post_id,
-                "campaign_id": campaign_id,
-                "scheduled_time": scheduled_time_str,
-                "message": message,
-                "image_keys": image_keys,
-                "status": "scheduled"
-            }
-        )
-
         # ---------- EventBridge Scheduler ----------
         utc_time = scheduled_dt.astimezone(timezone.utc)
         utc_str = utc_time.strftime("%Y-%m-%dT%H:%M:%S")
 
-        schedule_name = f"linkedin_post_{sub}_{int(datetime.utcnow().timestamp())}"
+        # Random suffix: two requests for the same user in one second no longer collide
+        schedule_name = f"linkedin_post_{sub}_{uuid.uuid4().hex[:16]}"
 
-        scheduler.create_schedule(
+        clients.get_scheduler().create_schedule(
             Name=schedule_name,
             GroupName="default",
             FlexibleTimeWindow={"Mode": "OFF"},
@@ -156,15 +154,33 @@ def lambda_handler(event, context):
             Target={
                 "Arn": STATUS_LAMBDA_ARN,
                 "RoleArn": EVENTBRIDGE_ROLE_ARN,
-                "Input": json.dumps({
+                "Input": json_dumps({
                     "sub": sub,
                     "message": message,
                     "scheduled_time": scheduled_time_str,
-                    "image_keys": image_keys
+                    "image_keys": image_keys,
+                    "schedule_name": schedule_name
                 })
             }
         )
 
+        # ---------- Update posts-table + insert linkedin-posts-table ----------
+        # One TransactWriteItems round trip instead of update_item + put_item.
+        # Runs only after the schedule exists, so a rejected schedule time
+        # never marks the post as scheduled; if the write fails the schedule
+        # is removed again so it cannot publish a post the DB never recorded.
+        try:
+            write_schedule_records(
+                post_id, campaign_id, sub, scheduled_time_str, title,
+                description, hashtags, image_keys, message
+            )
+        except Exception:
+            try:
+                clients.get_scheduler().delete_schedule(Name=schedule_name, GroupName="default")
+            except Exception:
+                pass  # best effort; the original error is what the caller sees
+            raise
+
         return response(200, {
             "message": "Post scheduled successfully",
             "scheduled_time": scheduled_time_str,
@@ -176,12 +192,5 @@ def lambda_handler(event, context):
         return response(500, str(e))
 
 
-def response(status, body):
-    return {
-        "statusCode": status,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*"
-        },
-        "body": json.dumps(body)
-    }
+# Preflight responses are identical on every call
+CORS_PREFLIGHT = response(200, {})
@@ -1,55 +1,59 @@
-import json
-import boto3
-from datetime import datetime, timezone, timedelta
+import uuid
+from datetime import datetime, timezone
 from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
 
-# ---------------- AWS Clients ----------------
-dynamodb = boto3.resource("dynamodb")
-scheduler = boto3.client("scheduler")
+from cammi_common import clients
+from cammi_common.tables import POSTS_TABLE, LINKEDIN_TABLE, posts_table
+from cammi_common.helpers import (
+    PKT, PKT_OFFSET, executor, to_dynamo, json_dumps, parse_body, cors_response as response
+)
 
 # ---------------- Constants ----------------
-POSTS_TABLE = "posts-table"
-LINKEDIN_TABLE = "linkedin-posts-table"
-
 STATUS_LAMBDA_ARN = "arn:aws:lambda:us-east-1:687088702813:function:status"
 EVENTBRIDGE_ROLE_ARN = "arn:aws:iam::687088702813:role/scheduler-invoke-lambda-role"
 
-PKT = timezone(timedelta(hours=5))
+SCHEDULE_UPDATE_EXPR = "SET scheduled_time = :st, #status = :s"
+STATUS_ATTR_NAMES = {"#status": "status"}
 
-# ---------------- Tables ----------------
-posts_table = dynamodb.Table(POSTS_TABLE)
-linkedin_table = dynamodb.Table(LINKEDIN_TABLE)
+# ---------- Warm-up ----------
+# The scheduler client is created lazily on the first non-OPTIONS request
+clients.warm_up("dynamodb")
 
 
-def lambda_handler(event, context):
-    try:
-        # -------------------------------
-        # CORS
-        # -------------------------------
-        if event.get("httpMethod") == "OPTIONS":
-            return response(200, {})
+POST_PROJECTION = "campaign_id, #t, #d, hashtag, image_keys, scheduled_time"
+POST_PROJECTION_NAMES = {"#t": "title", "#d": "description"}
+POST_ID_KEY = Key("post_id")
 
-        # -------------------------------
-        # 1. Parse input
-        # -------------------------------
-        body = json.loads(event.get("body", "{}"))
-        post_id = body.get("post_id")
-        sub = body.get("sub")
 
-        if not post_id or not sub:
-            return response(400, "post_id and sub are required")
+def fetch_post(post_id, campaign_id=None):
+    # Direct get_item when the full key is known, otherwise query by post_id
+    if campaign_id:
+        return posts_table.get_item(
+            Key={"post_id": post_id, "campaign_id": campaign_id},
+            ProjectionExpression=POST_PROJECTION,
+            ExpressionAttributeNames=POST_PROJECTION_NAMES
+        ).get("Item")
+
+    items = posts_table.query(
+        KeyConditionExpression=POST_ID_KEY.eq(post_id),
+        ProjectionExpression=POST_PROJECTION,
+        ExpressionAttributeNames=POST_PROJECTION_NAMES,
+        Limit=1
+    )["Items"]
+    return items[0] if items else None
 
+
+def schedule_post(post_id, sub, campaign_id=None):
+    """Schedule one post; returns (status_code, body) for the API response"""
+    try:
         # -------------------------------
         # 2. Fetch post from posts-table
         # -------------------------------
-        post_resp = posts_table.query(
-            KeyConditionExpression=Key("post_id").eq(post_id)
-        )
+        post_item = fetch_post(post_id, campaign_id)
 
-        if not post_resp["Items"]:
-            return response(404, "Post not found")
-
-        post_item = post_resp["Items"][0]
+        if not post_item:
+            return 404, "Post not found"
 
         campaign_id = post_item["campaign_id"]
         title = post_item.get("title", "")
@@ -59,7 +63,7 @@ def lambda_handler(event, context):
         scheduled_time_str = post_item.get("scheduled_time")
 
         if not scheduled_time_str:
-            return response(400, "scheduled_time missing in post")
+            return 400, "scheduled_time missing in post"
 
         # -------------------------------
         # 3. Build LinkedIn message
@@ -69,18 +73,19 @@ def lambda_handler(event, context):
         # -------------------------------
         # 4. Time handling (STRICT)
         # -------------------------------
-        pkt_time = datetime.fromisoformat(scheduled_time_str).astimezone(PKT)
-        pkt_time_str = pkt_time.isoformat()
-
-        utc_time = pkt_time.astimezone(timezone.utc)
+        # Parse once, convert to UTC once; PKT is a fixed offset so derive it arithmetically
+        utc_time = datetime.fromisoformat(scheduled_time_str).astimezone(timezone.utc)
         utc_str = utc_time.strftime("%Y-%m-%dT%H:%M:%S")  # NO Z
 
+        pkt_time_str = (utc_time + PKT_OFFSET).replace(tzinfo=PKT).isoformat()
+
         # -------------------------------
         # 5. Create EventBridge schedule
         # -------------------------------
-        schedule_name = f"linkedin_post_{sub}_{int(datetime.utcnow().timestamp())}"
+        # Random suffix: two requests for the same user in one second no longer collide
+        schedule_name = f"linkedin_post_{sub}_{uuid.uuid4().hex[:16]}"
 
-        scheduler.create_schedule(
+        clients.get_scheduler().create_schedule(
             Name=schedule_name,
             GroupName="default",
             FlexibleTimeWindow={"Mode": "OFF"},
@@ -89,74 +94,113 @@ def lambda_handler(event, context):
                 "Arn": STATUS_LAMBDA_ARN,
                 "RoleArn": EVENTBRIDGE_ROLE_ARN,
                 # 🔑 EXACT PAYLOAD EXPECTED BY status LAMBDA
-                "Input": json.dumps({
+                "Input": json_dumps({
                     "sub": sub,
                     "message": message,
                     "scheduled_time": pkt_time_str,
-                    "image_keys": image_keys
+                    "image_keys": image_keys,
+                    "schedule_name": schedule_name
                 })
             }
         )
 
         # -------------------------------
-        # 6. Update posts-table
-        # -------------------------------
-        posts_table.update_item(
-            Key={
-                "post_id": post_id,
-                "campaign_id": campaign_id
-            },
-            UpdateExpression="SET scheduled_time = :st, #status = :s",
-            ExpressionAttributeNames={
-                "#status": "status"
+        # 6. Update posts-table + insert linkedin-posts-table
+        #    (single TransactWriteItems round trip)
+        # -------------------------------
+        clients.dynamodb.meta.client.transact_write_items(TransactItems=[
+            {
+                "Update": {
+                    "TableName": POSTS_TABLE,
+                    "Key": to_dynamo({
+                        "post_id": post_id,
+                        "campaign_id": campaign_id
+                    }),
+                    "UpdateExpression": SCHEDULE_UPDATE_EXPR,
+                    "ExpressionAttributeNames": STATUS_ATTR_NAMES,
+                    "ExpressionAttributeValues": to_dynamo({
+                        ":st": pkt_time_str,
+                        ":s": "scheduled"
+                    })
+                }
             },
-            ExpressionAttributeValues={
-                ":st": pkt_time_str,
-                ":s": "scheduled"
+            {
+                "Put": {
+                    "TableName": LINKEDIN_TABLE,
+                    "Item": to_dynamo({
+                        "sub": sub,
+                        "post_time": pkt_time_str,      # 🔑 SORT KEY MATCHES status lambda
+                        "post_id": post_id,
+                        "campaign_id": campaign_id,
+                        "message": message,
+                        "image_keys": image_keys,
+                        "scheduled_time": pkt_time_str,
+                        "status": "scheduled"
+                    })
+                }
             }
-        )
+        ])
 
         # -------------------------------
-        # 7. Insert linkedin-posts-table
+        # 7. Success
         # -------------------------------
-        linkedin_table.put_item(
-            Item={
-                "sub": sub,
-                "post_time": pkt_time_str,      # 🔑 SORT KEY MATCHES status lambda
-                "post_id": post_id,
-                "campaign_id": campaign_id,
-                "message": message,
-                "image_keys": image_keys,
-                "scheduled_time": pkt_time_str,
-                "status": "scheduled"
-            }
-        )
-
-        # -------------------------------
-        # 8. Success
-        # -------------------------------
-        return response(200, {
+        return 200, {
             "message": "Post scheduled successfully",
             "scheduled_time": pkt_time_str,
             "scheduled_time_utc": utc_str,
             "schedule_name": schedule_name
-        })
+        }
+
+    except ClientError as e:
+        if e.operation_name == "CreateSchedule" and e.response["Error"]["Code"] == "ValidationException":
+            return 400, f"Invalid schedule time: {str(e)}"
+        return 500, str(e)
+
+    except Exception as e:
+        return 500, str(e)
+
+
+def lambda_handler(event, context):
+    try:
+        # -------------------------------
+        # CORS
+        # -------------------------------
+        if event.get("httpMethod") == "OPTIONS":
+            return CORS_PREFLIGHT
+
+        # -------------------------------
+        # 1. Parse input
+        # -------------------------------
+        body = parse_body(event)
+        _get = body.get
+        post_id, sub, campaign_id = _get("post_id"), _get("sub"), _get("campaign_id")
+        post_ids = _get("post_ids")
+
+        # -------------------------------
+        # Batch: several posts in one invocation, scheduled concurrently.
+        # Each post keeps its own schedule + transaction, so one failure
+        # does not roll back the others.
+        # -------------------------------
+        if post_ids:
+            if not sub:
+                return response(400, "post_ids and sub are required")
+
+            results = list(executor.map(lambda pid: schedule_post(pid, sub, campaign_id), post_ids))
+            return response(200, {
+                "results": [
+                    {"post_id": pid, "statusCode": status_code, "body": result}
+                    for pid, (status_code, result) in zip(post_ids, results)
+                ]
+            })
+
+        if not post_id or not sub:
+            return response(400, "post_id and sub are required")
 
-    except scheduler.exceptions.ValidationException as e:
-        return response(400, f"Invalid schedule time: {str(e)}")
+        return response(*schedule_post(post_id, sub, campaign_id))
 
     except Exception as e:
         return response(500, str(e))
 
 
-def response(status_code, body):
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "OPTIONS,POST",
-            "Access-Control-Allow-Headers": "Content-Type,Authorization"
-        },
-        "body": json.dumps(body)
-    }
+# Preflight responses are identical on every call
+CORS_PREFLIGHT = response(200, {})
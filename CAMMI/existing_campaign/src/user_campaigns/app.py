@@ -1,19 +1,63 @@
 import json
-import boto3
+import time
+import logging
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
 from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.types import TypeDeserializer
 from botocore.exceptions import ClientError
 
-# ---------- DynamoDB ----------
-dynamodb = boto3.resource("dynamodb")
+from cammi_common import clients
+from cammi_common.tables import CAMPAIGNS_TABLE, campaigns_table, posts_table
+from cammi_common.helpers import serializer, json_loads, cors_response as _response
 
-CAMPAIGNS_TABLE = "user-campaigns"
-POSTS_TABLE = "posts-table"
+# ---------- Logging ----------
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
 
+# ---------- DynamoDB ----------
+# Shared keep-alive tables from the cammi-common layer
 PROJECT_GSI = "project_id-index"
 CAMPAIGN_GSI = "campaign_id-index"
 
-campaigns_table = dynamodb.Table(CAMPAIGNS_TABLE)
-posts_table = dynamodb.Table(POSTS_TABLE)
+# Low-level paginator for the project query; pages are deserialized as they stream in
+campaigns_paginator = campaigns_table.meta.client.get_paginator("query")
+deserializer = TypeDeserializer()
+
+# ---------- Warm-up ----------
+clients.warm_up("dynamodb")
+
+# ---------- Worker pool ----------
+# Created once per container and shared by the per-campaign post queries and
+# status updates; kept within the layer's max_pool_connections so threads
+# never wait on a connection
+executor = ThreadPoolExecutor(max_workers=32)
+
+# ---------- Query Cache ----------
+# Warm containers reuse the project -> campaigns lookup for repeated polls.
+# Entries expire after CACHE_TTL seconds; a project's entry is dropped as
+# soon as one of its campaign statuses is rewritten. Posts are always read
+# fresh: their statuses are changed by other functions, and campaign status
+# writes must never be derived from a stale copy.
+CACHE_TTL = 30
+CACHE_MAX_ENTRIES = 512
+_project_cache = {}
+_cache_lock = Lock()
+
+
+def _cache_get(cache, key):
+    with _cache_lock:
+        cached = cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    return None
+
+
+def _cache_put(cache, key, value):
+    with _cache_lock:
+        if len(cache) >= CACHE_MAX_ENTRIES:
+            cache.clear()
+        cache[key] = (time.monotonic() + CACHE_TTL, value)
 
 
 def lambda_handler(event, context):
@@ -21,12 +65,12 @@ def lambda_handler(event, context):
 
     # ✅ CORS preflight
     if event.get("httpMethod") == "OPTIONS":
-        return _response(200, {"message": "CORS preflight"})
+        return CORS_PREFLIGHT
 
     body = event.get("body")
     if body:
         try:
-            event = json.loads(body)
+            event = json_loads(body)
         except json.JSONDecodeError:
             return _response(400, {"error": "Invalid JSON in request body"})
 
@@ -37,16 +81,24 @@ def lambda_handler(event, context):
         return _response(400, {"error": "project_id is required"})
 
     try:
-        # 1️⃣ Fetch campaigns by project_id
-        campaigns = _query_by_project_id(project_id)
-
-        # 2️⃣ Filter campaigns that have posts + update status
-        filtered_campaigns = []
-        for campaign in campaigns:
+        # 1️⃣ Stream campaigns by project_id and 2️⃣ start each campaign's
+        # posts query as soon as its page arrives
+        campaigns, campaign_ids, pending = [], [], []
+        for campaign in _iter_campaigns_by_project_id(project_id):
+            # Copy: cached items must not pick up total_posts or a status
+            # whose write has not happened yet
+            campaign = dict(campaign)
             campaign_id = str(campaign.get("campaign_id")).strip()
+            campaigns.append(campaign)
+            campaign_ids.append(campaign_id)
+            pending.append(executor.submit(_get_posts_for_campaign, campaign_id))
 
-            posts = _get_posts_for_campaign(campaign_id)
+        posts_per_campaign = (future.result() for future in pending)
 
+        # 3️⃣ Filter campaigns that have posts + collect status changes
+        filtered_campaigns = []
+        updates = []
+        for campaign, campaign_id, posts in zip(campaigns, campaign_ids, posts_per_campaign):
             # ❌ Skip campaigns with NO posts
             if not posts:
                 continue
@@ -56,17 +108,19 @@ def lambda_handler(event, context):
             # 🔄 Determine campaign status
             new_status = _derive_campaign_status(posts)
 
-            if new_status and campaign.get("status") != new_status:
-                _update_campaign_status(
-                    campaign_id,
-                    campaign["project_id"],
-                    new_status
-                )
+            # Compare case-insensitively so "Active" vs "active" is not rewritten
+            current_status = str(campaign.get("status") or "").strip().lower()
+            if new_status and current_status != new_status:
+                updates.append((campaign_id, campaign["project_id"], new_status))
                 campaign["status"] = new_status
 
             filtered_campaigns.append(campaign)
 
-        # 3️⃣ Format response
+        # UpdateItem cannot be batched, so run the status writes concurrently
+        if updates:
+            list(executor.map(lambda args: _update_campaign_status(*args), updates))
+
+        # 4️⃣ Format response
         formatted_campaigns = _format_campaigns(filtered_campaigns)
 
         return _response(
@@ -90,60 +144,75 @@ def lambda_handler(event, context):
 
 # ---------- Helpers ----------
 
-def _query_by_project_id(project_id):
-    """Query campaigns using project_id GSI (pagination-safe)"""
-    items = []
-    last_key = None
-
-    while True:
-        params = {
-            "IndexName": PROJECT_GSI,
-            "KeyConditionExpression": Key("project_id").eq(project_id)
-        }
-
-        if last_key:
-            params["ExclusiveStartKey"] = last_key
+def _iter_campaigns_by_project_id(project_id):
+    """
+    Yield campaigns from the project_id GSI page by page, so callers can
+    start per-campaign work before the last page arrives
+    """
+    cached = _cache_get(_project_cache, project_id)
+    if cached is not None:
+        yield from cached
+        return
 
-        response = campaigns_table.query(**params)
-        items.extend(response.get("Items", []))
-
-        last_key = response.get("LastEvaluatedKey")
-        if not last_key:
-            break
+    items = []
+    pages = campaigns_paginator.paginate(
+        TableName=CAMPAIGNS_TABLE,
+        IndexName=PROJECT_GSI,
+        KeyConditionExpression="project_id = :p",
+        ExpressionAttributeValues={":p": serializer.serialize(project_id)}
+    )
+    for page in pages:
+        for raw in page.get("Items", []):
+            item = {k: deserializer.deserialize(v) for k, v in raw.items()}
+            items.append(item)
+            yield item
 
-    return items
+    _cache_put(_project_cache, project_id, items)
 
 
 def _get_posts_for_campaign(campaign_id):
     """Fetch posts for a campaign using campaign_id GSI"""
-    print("Querying posts for campaign_id:", repr(campaign_id))
+    logger.debug("Querying posts for campaign_id: %r", campaign_id)
 
+    # Only the status is read (plus the item count), so skip everything else
     response = posts_table.query(
         IndexName=CAMPAIGN_GSI,
-        KeyConditionExpression=Key("campaign_id").eq(campaign_id)
+        KeyConditionExpression=Key("campaign_id").eq(campaign_id),
+        ProjectionExpression="#s",
+        ExpressionAttributeNames={"#s": "status"}
     )
 
     return response.get("Items", [])
 
 
-def _derive_campaign_status(posts):
-    """Determine campaign status from posts (case-insensitive)"""
-
-    statuses = {
-        str(post.get("status", "")).strip().lower()
-        for post in posts
-    }
+_STATUS_FLAGS = {
+    "generated": 1,
+    "draft": 1,
+    "scheduled": 2,
+    "published": 4
+}
+_CAMPAIGN_STATUS_BY_FLAG = {
+    1: "in-progress",
+    2: "active",
+    4: "completed"
+}
 
-    if statuses.issubset({"generated", "draft"}):
-        return "in-progress"
 
-    if statuses == {"scheduled"}:
-        return "active"
+def _derive_campaign_status(posts):
+    """Determine campaign status from posts (case-insensitive)"""
+    # Single pass with one bit per status group; stop as soon as the posts
+    # are mixed (more than one bit set) or carry an unknown status
+    flags = 0
+    for post in posts:
+        flag = _STATUS_FLAGS.get(str(post.get("status", "")).strip().lower())
+        if not flag:
+            return None
 
-    if statuses == {"published"}:
-        return "completed"
+        flags |= flag
+        if flags & (flags - 1):
+            return None
 
-    return None
+    return _CAMPAIGN_STATUS_BY_FLAG.get(flags)
 
 
 def _update_campaign_status(campaign_id, project_id, status):
@@ -158,6 +227,9 @@ def _update_campaign_status(campaign_id, project_id, status):
         ExpressionAttributeValues={":s": status}
     )
 
+    with _cache_lock:
+        _project_cache.pop(project_id, None)
+
 
 def _format_campaigns(items):
     """Return campaigns as numbered dictionary"""
@@ -167,15 +239,5 @@ def _format_campaigns(items):
     return formatted
 
 
-def _response(status_code, body):
-    """Standard HTTP response with CORS"""
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "OPTIONS,GET,POST,PUT",
-            "Access-Control-Allow-Headers": "Content-Type,Authorization"
-        },
-        "body": json.dumps(body, default=str)
-    }
+# Preflight responses are identical on every call
+CORS_PREFLIGHT = _response(200, {"message": "CORS preflight"})
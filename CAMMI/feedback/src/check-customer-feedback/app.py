@@ -1,17 +1,54 @@
 import json
 import boto3
-from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.conditions import Key
+from botocore.config import Config
+
+try:
+    import orjson  # faster parse/serialize when the layer provides it
+except ImportError:
+    orjson = None
+
+
+def json_loads(raw):
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def json_dumps(obj):
+    if orjson:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
 
 # Initialize DynamoDB resource
-dynamodb = boto3.resource('dynamodb')
+# One session per container; keep-alive connections are reused across warm invocations
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=64,
+    retries={"mode": "standard", "max_attempts": 3}
+)
+session = boto3.session.Session()
+dynamodb = session.resource('dynamodb', config=BOTO_CONFIG)
 
 # Table names
 USERS_TABLE = "users-table"
 FEEDBACK_TABLE = "users-feedback-table"
 
+USERS_SESSION_GSI = "session_id-index"
+
+# Warm-up: resolve endpoints and open the connection during container init so
+# the first request does not pay for it. Failures are harmless and ignored.
+try:
+    dynamodb.meta.client.describe_endpoints()
+except Exception:
+    pass
+
 def lambda_handler(event, context):
+    # CORS preflight
+    if event.get("httpMethod") == "OPTIONS":
+        return CORS_PREFLIGHT
+
     # Parse input
-    body = json.loads(event.get("body", "{}"))
+    body = json_loads(event.get("body") or "{}")
     session_id = body.get("session_id")
 
     if not session_id:
@@ -20,9 +57,14 @@ def lambda_handler(event, context):
     # Step 1: Find user record using session_id (not the partition key)
     users_table = dynamodb.Table(USERS_TABLE)
 
-    # Since 'session_id' is not the partition key, we use a Scan with a filter expression
-    user_resp = users_table.scan(
-        FilterExpression=Attr('session_id').eq(session_id)
+    # 'session_id' is not the partition key, so look it up through its GSI
+    user_resp = users_table.query(
+        IndexName=USERS_SESSION_GSI,
+        KeyConditionExpression=Key('session_id').eq(session_id),
+        Select="SPECIFIC_ATTRIBUTES",
+        ProjectionExpression="#id",
+        ExpressionAttributeNames={"#id": "id"},
+        Limit=1
     )
     users = user_resp.get("Items", [])
 
@@ -36,27 +78,35 @@ def lambda_handler(event, context):
     if not user_id:
         return _response(400, "User record missing 'id' field.")
 
-    # Step 2: Query feedback table for this user_id
+    # Step 2: Check whether this user_id has feedback (count only, no items)
     feedback_table = dynamodb.Table(FEEDBACK_TABLE)
     feedback_resp = feedback_table.query(
-        KeyConditionExpression=Key('user_id').eq(user_id)
+        KeyConditionExpression=Key('user_id').eq(user_id),
+        Select="COUNT",
+        Limit=1
     )
-    feedback_items = feedback_resp.get("Items", [])
 
     # Step 3: Return result
-    if feedback_items:
-        return _response(200, "Done")
-    else:
-        return _response(200, "Pending")
+    return RESP_DONE if feedback_resp.get("Count") else RESP_PENDING
+
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type,Authorization",
+    "Access-Control-Allow-Methods": "OPTIONS,POST,GET"
+}
+
+# Preflight responses are identical on every call
+CORS_PREFLIGHT = {"statusCode": 200, "headers": CORS_HEADERS, "body": "{}"}
 
 # Helper to format Lambda responses
 def _response(status_code, message):
     return {
         "statusCode": status_code,
-        "headers": {
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type,Authorization",
-            "Access-Control-Allow-Methods": "OPTIONS,POST,GET"
-        },
-        "body": json.dumps({"message": message})
+        "headers": CORS_HEADERS,
+        "body": json_dumps({"message": message})
     }
+
+
+# Status responses are identical on every call
+RESP_DONE = _response(200, "Done")
+RESP_PENDING = _response(200, "Pending")
@@ -8,7 +8,17 @@ dynamodb = boto3.resource('dynamodb')
 USERS_TABLE = "users-table"
 FEEDBACK_TABLE = "users-feedback-table"
 
+# Open the DynamoDB connection at init rather than on the first request
+try:
+    dynamodb.meta.client.describe_endpoints()
+except Exception:
+    pass
+
 def lambda_handler(event, context):
+    # --- CORS preflight ---
+    if event.get("httpMethod") == "OPTIONS":
+        return CORS_PREFLIGHT
+
     # --- Parse body ---
     if "body" not in event or not event["body"]:
         return build_response(400, {"error": "Missing request body."})
@@ -58,15 +68,21 @@ def lambda_handler(event, context):
     })
 
 
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "OPTIONS,POST,GET",
+    "Access-Control-Allow-Headers": "Content-Type"
+}
+
+# Preflight responses are identical on every call
+CORS_PREFLIGHT = {"statusCode": 200, "headers": CORS_HEADERS, "body": "{}"}
+
+
 def build_response(status_code, body_dict):
     """Formats response with CORS headers."""
     return {
         "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "OPTIONS,POST,GET",
-            "Access-Control-Allow-Headers": "Content-Type"
-        },
+        "headers": CORS_HEADERS,
         "body": json.dumps(body_dict)
     }
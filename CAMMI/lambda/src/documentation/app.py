@@ -10,25 +10,60 @@ Fixed version — addresses:
   5. Header/footer placeholders replaced correctly
 """
 
+from __future__ import annotations
+
+import time
 import uuid
 import boto3
 import json
 import re
 import base64
 from io import BytesIO
-from datetime import datetime
 from copy import deepcopy
+from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from docx import Document
-from docx.shared import Inches
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+
+# ---------- python-docx (lazy) ----------
+# python-docx pulls in lxml; it is imported on first render, once the
+# template JSON has been read, instead of during container init
+Document = Inches = qn = OxmlElement = None
+
+
+def _load_docx():
+    global Document, Inches, qn, OxmlElement
+    if Document is None:
+        from docx import Document
+        from docx.shared import Inches
+        from docx.oxml.ns import qn
+        from docx.oxml import OxmlElement
 
 # ---------- AWS ----------
-s3 = boto3.client("s3")
+# Keep-alive pool sized above S3_FETCH_WORKERS so parallel reads each get a socket
+BOTO_CONFIG = Config(
+    max_pool_connections=32,
+    tcp_keepalive=True,
+    retries={"mode": "standard", "max_attempts": 3},
+)
+s3 = boto3.client("s3", config=BOTO_CONFIG)
 dynamodb = boto3.resource("dynamodb")
 DOCUMENT_HISTORY_TABLE = "documents-history-table"
+PROJECT_STATE_TABLE = "project-state-table"
+
+# ---------- WORKERS ----------
+# Subsection files are fetched concurrently; python-docx rendering stays serial
+S3_FETCH_WORKERS = 16
+executor = ThreadPoolExecutor(max_workers=S3_FETCH_WORKERS)
+
+# ---------- CACHES ----------
+# Warm containers keep the DOCX template bytes (never change) and recent
+# project logos (refreshed after LOGO_CACHE_TTL seconds or on upload).
+_TEMPLATE_CACHE = {}
+LOGO_CACHE_TTL = 300
+_LOGO_CACHE = {}
 
 # ---------- CONFIG ----------
 TABLE_STYLE = "Light Grid Accent 1"
@@ -48,6 +83,17 @@ STYLE_BODY = "Cammi Body"
 STYLE_BULLET = "Cammi Bullet"
 STYLE_LABEL = "Cammi Label"
 
+# ---------- REGEX ----------
+# Compiled once per container; the render loops below run them per line
+_SEP_RE = re.compile(r"^\s*\|?\s*:?-{3,}\s*(\|\s*:?-{3,}\s*)+\|?\s*$")
+_WS_RE = re.compile(r"\s+")
+_PUNCT_RE = re.compile(r"[^a-z0-9 ]+")
+_MULTI_NL = re.compile(r"\n{3,}")
+_SPACES = re.compile(r"[ \t]+")
+_NON_ALNUM = re.compile(r"[^a-zA-Z0-9]")
+_PAGEREF_RE = re.compile(r"PAGEREF\s+(\S+)")
+_CELL_SPLIT = re.compile(r"\s*\|\s*")
+
 DOCUMENT_TYPE_NAMES = {
     "gtm":       "Go to Market",
     "icp":       "Ideal Customer Profile",
@@ -84,94 +130,130 @@ def save_document_history_to_dynamodb(user_id, project_id, document_type,
         print(f"❌ DynamoDB error: {e}")
         return False
 
+def save_latest_docx_pointer(project_id, document_type, docx_key):
+    """
+    Record the newest DOCX key on the project's state item so
+    download-as-pdf can skip listing marketing_strategy_document/.
+    """
+    try:
+        dynamodb.Table(PROJECT_STATE_TABLE).update_item(
+            Key={"project_id": project_id},
+            UpdateExpression="SET #latest = :key",
+            ConditionExpression="attribute_exists(project_id)",
+            ExpressionAttributeNames={"#latest": f"latest_docx_{document_type.lower()}"},
+            ExpressionAttributeValues={":key": docx_key},
+        )
+        return True
+    except Exception as e:
+        print(f"❌ Latest DOCX pointer not saved: {e}")
+        return False
+
 # ═══════════════════════════════════════════════════════════
 #  TEXT HELPERS
 # ═══════════════════════════════════════════════════════════
 
+@lru_cache(maxsize=256)
 def format_heading(text: str) -> str:
     return " ".join(w.capitalize() for w in text.replace("_", " ").split())
 
 
 def clean_text(text: str) -> str:
     """Normalize whitespace, collapse triple+ newlines, strip."""
+    # Already-normalized text (the common case) skips the regex passes
+    if ("\r" not in text and "\t" not in text
+            and "\n\n\n" not in text and "  " not in text):
+        return text.strip()
     text = text.replace("\r\n", "\n").replace("\r", "\n")
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    text = re.sub(r"[ \t]+", " ", text)
+    text = _MULTI_NL.sub("\n\n", text)
+    text = _SPACES.sub(" ", text)
     return text.strip()
 
 
-def _is_short_standalone_line(line: str) -> bool:
+def _is_sep(line: str) -> bool:
+    """Markdown table separator row; substring checks skip the regex for prose."""
+    return "-" in line and "|" in line and _SEP_RE.match(line) is not None
+
+
+# Lines whose first character decides their type outright
+_LEAD_CHARS = {"#": "heading", "-": "bullet", "*": "bullet", "•": "bullet"}
+
+
+def _is_short_standalone_line(stripped: str) -> bool:
     """
     Detect lines that look like messaging lines / short value props.
     These are typically 1-sentence lines that should be bulleted.
     Heuristic: ends with a period, no colon, under 150 chars, not a heading.
+    Expects an already-stripped line.
     """
-    stripped = line.strip()
     if not stripped:
         return False
-    if stripped.startswith(("#", "-", "*", "•")):
+    if stripped[0] in _LEAD_CHARS:
         return False
     if ":" in stripped:
         return False
     if len(stripped) > 150:
         return False
-    if stripped.endswith((".")) and len(stripped.split()) >= 4:
+    if stripped.endswith(".") and len(stripped.split()) >= 4:
         return True
     return False
 
 
 def _classify_lines(lines: list) -> list:
     """
-    Walk through lines and classify sequences of short standalone lines
-    as bullets. Returns list of (type, text) tuples.
+    Walk through lines once and classify them; sequences of short standalone
+    lines become bullets and markdown tables are consumed whole.
+    Returns list of (type, text) tuples.
     Types: 'heading1', 'heading2', 'heading3', 'bullet', 'label',
-           'label_heading', 'body', 'blank', 'table_start'
+           'label_heading', 'body', 'blank', 'table'
     """
-    sep_re = re.compile(r"^\s*\|?\s*:?-{3,}\s*(\|\s*:?-{3,}\s*)+\|?\s*$")
+    lines = [l.strip() for l in lines]
+    n = len(lines)
     result = []
+    append = result.append
 
     i = 0
-    while i < len(lines):
-        line = lines[i].strip()
+    while i < n:
+        line = lines[i]
 
         # Blank
         if not line:
-            result.append(("blank", ""))
+            append(("blank", ""))
             i += 1
             continue
 
-        # Markdown table start
-        if "|" in line and (i + 1) < len(lines) and sep_re.match(lines[i + 1].strip()):
-            result.append(("table_start", str(i)))
-            i += 1
+        # Markdown table: header + separator row(s) + body rows in one token
+        if "|" in line and (i + 1) < n and _is_sep(lines[i + 1]):
+            j = i + 1
+            while j < n and _is_sep(lines[j]):
+                j += 1
+            while j < n and "|" in lines[j]:
+                j += 1
+            append(("table", "\n".join(lines[i:j])))
+            i = j
             continue
 
-        # Headings
-        if line.startswith("### "):
-            result.append(("heading3", line[4:].strip()))
-            i += 1
-            continue
-        if line.startswith("## "):
-            result.append(("heading2", line[3:].strip()))
-            i += 1
-            continue
-        if line.startswith("# "):
-            result.append(("heading1", line[2:].strip()))
-            i += 1
-            continue
+        kind = _LEAD_CHARS.get(line[0])
+
+        # Headings ("# ", "## ", "### ")
+        if kind == "heading":
+            level = len(line) - len(line.lstrip("#"))
+            if level <= 3 and line[level:level + 1] == " ":
+                append((f"heading{level}", line[level + 1:].strip()))
+                i += 1
+                continue
 
         # Explicit bullets
-        if line.startswith(("-", "*", "•")):
-            result.append(("bullet", line.lstrip("-*• ").strip()))
+        elif kind == "bullet":
+            append(("bullet", line.lstrip("-*• ").strip()))
             i += 1
             continue
 
         # Label: Value  or  Label heading (ending with colon)
         if ":" in line:
             if line.endswith(":"):
-                result.append(("label_heading", line))
+                append(("label_heading", line))
             else:
-                result.append(("label", line))
+                append(("label", line))
             i += 1
             continue
 
@@ -180,31 +262,30 @@ def _classify_lines(lines: list) -> list:
         if _is_short_standalone_line(line):
             # Look ahead through blank lines: if there are 2+ short lines
             # in the run (ignoring blanks between them), treat all as bullets
-            run_start = i
             j = i
-            short_indices = []
-            while j < len(lines):
-                s = lines[j].strip()
+            short_lines = []
+            while j < n:
+                s = lines[j]
                 if _is_short_standalone_line(s):
-                    short_indices.append(j)
+                    short_lines.append(s)
                     j += 1
                 elif not s:
                     # Skip blank lines between short lines
                     j += 1
                 else:
                     break
-            if len(short_indices) >= 2:
-                for idx in short_indices:
-                    result.append(("bullet", lines[idx].strip()))
+            if len(short_lines) >= 2:
+                for s in short_lines:
+                    append(("bullet", s))
                 i = j
             else:
                 # Single short line → body
-                result.append(("body", lines[run_start].strip()))
-                i = run_start + 1
+                append(("body", line))
+                i += 1
             continue
 
         # Default body
-        result.append(("body", line))
+        append(("body", line))
         i += 1
 
     return result
@@ -215,8 +296,11 @@ def _classify_lines(lines: list) -> list:
 # ═══════════════════════════════════════════════════════════
 
 def load_template_from_s3(bucket, key):
-    response = s3.get_object(Bucket=bucket, Key=key)
-    return Document(BytesIO(response["Body"].read()))
+    data = _TEMPLATE_CACHE.get((bucket, key))
+    if data is None:
+        response = s3.get_object(Bucket=bucket, Key=key)
+        data = _TEMPLATE_CACHE[(bucket, key)] = response["Body"].read()
+    return Document(BytesIO(data))
 
 
 def read_json_from_s3(bucket, key):
@@ -292,6 +376,7 @@ def save_project_logo_to_s3(project_id: str, logo_base64: str):
         logo_key = f"logos/{project_id}/logo.png"
         s3.put_object(Bucket="cammi-devprod", Key=logo_key,
                       Body=image_bytes, ContentType="image/png")
+        _LOGO_CACHE[project_id] = (time.time() + LOGO_CACHE_TTL, image_bytes)
         print(f"✅ Logo saved at s3://cammi-devprod/{logo_key}")
         return logo_key
     except Exception as e:
@@ -300,14 +385,21 @@ def save_project_logo_to_s3(project_id: str, logo_base64: str):
 
 
 def get_project_logo_from_s3(project_id: str):
-    try:
-        response = s3.get_object(Bucket="cammi-devprod",
-                                 Key=f"logos/{project_id}/logo.png")
-        return BytesIO(response["Body"].read())
-    except ClientError as e:
-        if e.response["Error"]["Code"] == "NoSuchKey":
-            return None
-        raise
+    cached = _LOGO_CACHE.get(project_id)
+    if cached and cached[0] > time.time():
+        logo_bytes = cached[1]
+    else:
+        try:
+            response = s3.get_object(Bucket="cammi-devprod",
+                                     Key=f"logos/{project_id}/logo.png")
+            logo_bytes = response["Body"].read()
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "NoSuchKey":
+                raise
+            logo_bytes = None
+        _LOGO_CACHE[project_id] = (time.time() + LOGO_CACHE_TTL, logo_bytes)
+    # Fresh stream per call; the bytes themselves are shared
+    return BytesIO(logo_bytes) if logo_bytes else None
 
 
 def add_logo_to_header(document: Document, project_id: str):
@@ -331,38 +423,63 @@ def add_logo_to_header(document: Document, project_id: str):
 #  MARKDOWN TABLE → DOCX TABLE
 # ═══════════════════════════════════════════════════════════
 
-def _flush_md_table(lines, start_idx):
-    """Extract a complete markdown table starting at start_idx."""
-    sep_re = re.compile(r"^\s*\|?\s*:?-{3,}\s*(\|\s*:?-{3,}\s*)+\|?\s*$")
-    header_line = lines[start_idx].strip()
-    j = start_idx + 1
-    if j >= len(lines) or not sep_re.match(lines[j].strip()):
-        return start_idx + 1, None
-    buf = [header_line]
-    while j < len(lines) and sep_re.match(lines[j].strip()):
-        buf.append(lines[j].strip())
-        j += 1
-    while j < len(lines) and "|" in lines[j]:
-        buf.append(lines[j].strip())
-        j += 1
-    return j, "\n".join(buf)
+def _mk_run(text: str, bold: bool = False):
+    """Build a detached <w:r> holding `text`."""
+    r = OxmlElement("w:r")
+    if bold:
+        rpr = OxmlElement("w:rPr")
+        rpr.append(OxmlElement("w:b"))
+        r.append(rpr)
+    t = OxmlElement("w:t")
+    t.text = text
+    if text != text.strip():
+        t.set(qn("xml:space"), "preserve")
+    r.append(t)
+    return r
+
+
+def _mk_para(style_id: str, *runs):
+    """Build a detached <w:p> with the given style ID and (text, bold) runs."""
+    p = OxmlElement("w:p")
+    ppr = OxmlElement("w:pPr")
+    pstyle = OxmlElement("w:pStyle")
+    pstyle.set(qn("w:val"), style_id)
+    ppr.append(pstyle)
+    p.append(ppr)
+    for text, bold in runs:
+        p.append(_mk_run(text, bold))
+    return p
+
+
+def _set_cell_text(cell, text: str, bold: bool = False):
+    """Write a single run into a fresh cell's paragraph via lxml."""
+    tc = cell._tc
+    p = tc.find(qn("w:p"))
+    if p is None:
+        p = OxmlElement("w:p")
+        tc.append(p)
+    p.append(_mk_run(text, bold))
+
+
+def _split_cells(line: str) -> list:
+    """'| a | b |' → ['a', 'b']; empty inner cells keep their column."""
+    return _CELL_SPLIT.split(line.strip("| \t"))
 
 
 def markdown_table_to_docx(md_table: str, doc: Document):
     lines = [l.strip() for l in md_table.strip().split("\n") if l.strip()]
     if len(lines) < 2:
         return
-    header = [h.strip() for h in lines[0].split("|") if h.strip()]
-    if not header:
+    header = _split_cells(lines[0])
+    if not any(header):
         return
-    sep_re = re.compile(r"^\s*\|?\s*:?-{3,}\s*(\|\s*:?-{3,}\s*)+\|?\s*$")
     rows = []
     for line in lines[1:]:
-        if sep_re.match(line):
+        if _is_sep(line):
             continue
         if "|" in line:
-            row = [c.strip() for c in line.split("|") if c.strip()]
-            if row:
+            row = _split_cells(line)
+            if any(row):
                 rows.append(row)
     table = doc.add_table(rows=len(rows) + 1, cols=len(header))
     try:
@@ -370,16 +487,14 @@ def markdown_table_to_docx(md_table: str, doc: Document):
     except Exception:
         pass
     table.autofit = True
+    # Resolve the cell grid once instead of table.cell() per write
+    cells = [r.cells for r in table.rows]
+    ncols = len(header)
     for j, h in enumerate(header):
-        cell = table.cell(0, j)
-        cell.text = h
-        for para in cell.paragraphs:
-            for run in para.runs:
-                run.bold = True
-    for i, row in enumerate(rows):
-        for j, txt in enumerate(row):
-            if j < len(header):
-                table.cell(i + 1, j).text = txt
+        _set_cell_text(cells[0][j], h, bold=True)
+    for i, row in enumerate(rows, start=1):
+        for j, txt in enumerate(row[:ncols]):
+            _set_cell_text(cells[i][j], txt)
 
 
 # ═══════════════════════════════════════════════════════════
@@ -392,9 +507,22 @@ def markdown_table_to_docx(md_table: str, doc: Document):
 #  - Consecutive blank lines collapsed to a single spacing gap
 # ═══════════════════════════════════════════════════════════
 
+# Style name → style ID for the one master template, resolved on first use
+_STYLE_IDS = {}
+
+
+def _style_ids(document: Document) -> dict:
+    if not _STYLE_IDS:
+        for name in (STYLE_HEADING1, STYLE_HEADING2, STYLE_HEADING3,
+                     STYLE_BODY, STYLE_BULLET, STYLE_LABEL):
+            _STYLE_IDS[name] = document.styles[name].style_id
+    return _STYLE_IDS
+
+
+@lru_cache(maxsize=2048)
 def _normalize_heading(s: str) -> str:
-    s = re.sub(r"\s+", " ", s).strip().lower()
-    return re.sub(r"[^a-z0-9 ]+", "", s)
+    s = _WS_RE.sub(" ", s).strip().lower()
+    return _PUNCT_RE.sub("", s)
 
 
 def add_formatted_paragraphs(document: Document, text: str, template_h1: str = ""):
@@ -402,11 +530,15 @@ def add_formatted_paragraphs(document: Document, text: str, template_h1: str = "
     Parse content text and add properly formatted paragraphs to the document.
     No empty paragraphs are inserted; spacing is controlled by styles.
     """
-    text = clean_text(text)
-    lines = text.split("\n")
-    sep_re = re.compile(r"^\s*\|?\s*:?-{3,}\s*(\|\s*:?-{3,}\s*)+\|?\s*$")
+    classified = _classify_lines(clean_text(text).split("\n"))
+    template_h1_norm = _normalize_heading(template_h1) if template_h1 else ""
 
-    classified = _classify_lines(lines)
+    # Paragraphs are built as raw XML and placed before the body's sectPr,
+    # exactly where add_paragraph / add_table would put them
+    styles = _style_ids(document)
+    body = document.element.body
+    sect_pr = body.find(qn("w:sectPr"))
+    emit = sect_pr.addprevious if sect_pr is not None else body.append
 
     prev_type = None
     i = 0
@@ -435,77 +567,69 @@ def add_formatted_paragraphs(document: Document, text: str, template_h1: str = "
             continue
 
         # ── Markdown table ──
-        if ctype == "table_start":
-            start_idx = int(ctext)
-            end_idx, md_table = _flush_md_table(lines, start_idx)
-            if md_table:
-                markdown_table_to_docx(md_table, document)
-            # Skip all classified entries that correspond to table lines
-            i += 1
-            while i < len(classified) and classified[i][0] == "table_start":
-                i += 1
+        if ctype == "table":
+            markdown_table_to_docx(ctext, document)
             prev_type = "table"
+            i += 1
             continue
 
         # ── H1 (skip if duplicate of section heading) ──
         if ctype == "heading1":
-            if not (template_h1 and
-                    _normalize_heading(ctext) == _normalize_heading(template_h1)):
-                document.add_paragraph(ctext, style=STYLE_HEADING1)
+            if not (template_h1_norm and
+                    _normalize_heading(ctext) == template_h1_norm):
+                emit(_mk_para(styles[STYLE_HEADING1], (ctext, False)))
             prev_type = ctype
             i += 1
             continue
 
         # ── H2 ──
         if ctype == "heading2":
-            document.add_paragraph(ctext, style=STYLE_HEADING2)
+            emit(_mk_para(styles[STYLE_HEADING2], (ctext, False)))
             prev_type = ctype
             i += 1
             continue
 
         # ── H3 ──
         if ctype == "heading3":
-            document.add_paragraph(ctext, style=STYLE_HEADING3)
+            emit(_mk_para(styles[STYLE_HEADING3], (ctext, False)))
             prev_type = ctype
             i += 1
             continue
 
         # ── Bullet ──
         if ctype == "bullet":
-            p = document.add_paragraph(style=STYLE_BULLET)
             # Handle "Label: Value" inside bullets
             if ":" in ctext and not ctext.endswith(":"):
                 label, _, rest = ctext.partition(":")
-                p.add_run(label.strip() + ": ").bold = True
-                p.add_run(rest.strip())
+                emit(_mk_para(styles[STYLE_BULLET],
+                              (label.strip() + ": ", True), (rest.strip(), False)))
             else:
-                p.add_run(ctext)
+                emit(_mk_para(styles[STYLE_BULLET], (ctext, False)))
             prev_type = ctype
             i += 1
             continue
 
         # ── Label heading (line ending with colon) ──
         if ctype == "label_heading":
-            p = document.add_paragraph(style=STYLE_LABEL)
-            p.add_run(ctext).bold = True
+            emit(_mk_para(styles[STYLE_LABEL], (ctext, True)))
             prev_type = ctype
             i += 1
             continue
 
         # ── Label: Value ──
         if ctype == "label":
-            p = document.add_paragraph(style=STYLE_BODY)
             label, _, value = ctext.partition(":")
-            p.add_run(label.strip() + ": ").bold = True
+            runs = [(label.strip() + ": ", True)]
             if value.strip():
-                p.add_run(value.strip())
+                runs.append((value.strip(), False))
+            emit(_mk_para(styles[STYLE_BODY], *runs))
             prev_type = ctype
             i += 1
             continue
 
         # ── Body paragraph ──
         if ctype == "body":
-            document.add_paragraph(ctext, style=STYLE_BODY)
+            emit(_mk_para(styles[STYLE_BODY], (ctext, False)))
             prev_type = ctype
             i += 1
             continue
@@ -522,7 +646,7 @@ def add_formatted_paragraphs(document: Document, text: str, template_h1: str = "
 
 def _make_bookmark_id(text: str, idx: int) -> str:
     """Create a safe bookmark name from heading text."""
-    safe = re.sub(r"[^a-zA-Z0-9]", "", text)[:20]
+    safe = _NON_ALNUM.sub("", text)[:20]
     return f"_Toc{safe}{idx}"
 
 
@@ -544,6 +668,85 @@ def add_heading_with_bookmark(document: Document, text: str, style: str,
     return p
 
 
+@lru_cache(maxsize=8)
+def _toc_entry_template(level: int):
+    """
+    TOC entry paragraph for `level` (style, dot-leader tab, indent, and the
+    PAGEREF field runs), built once per level and deep-copied per heading.
+    """
+    toc_p = OxmlElement("w:p")
+    toc_ppr = OxmlElement("w:pPr")
+    toc_style = OxmlElement("w:pStyle")
+    toc_style.set(qn("w:val"), f"TOC{level}" if level <= 3 else "TOC1")
+    toc_ppr.append(toc_style)
+
+    tabs = OxmlElement("w:tabs")
+    tab = OxmlElement("w:tab")
+    tab.set(qn("w:val"), "right")
+    tab.set(qn("w:leader"), "dot")
+    tab.set(qn("w:pos"), "9360")
+    tabs.append(tab)
+    toc_ppr.append(tabs)
+
+    if level > 1:
+        ind = OxmlElement("w:ind")
+        ind.set(qn("w:left"), str((level - 1) * 240))
+        toc_ppr.append(ind)
+
+    toc_p.append(toc_ppr)
+
+    # Heading text run (text set per entry)
+    toc_r = OxmlElement("w:r")
+    toc_r.append(OxmlElement("w:t"))
+    toc_p.append(toc_r)
+
+    # Tab character (triggers dot leader)
+    tab_r = OxmlElement("w:r")
+    tab_t = OxmlElement("w:t")
+    tab_t.set(qn("xml:space"), "preserve")
+    tab_t.text = "\t"
+    tab_r.append(tab_t)
+    toc_p.append(tab_r)
+
+    # PAGEREF field code → resolves to real page number
+    # Field begin
+    fld_begin_r = OxmlElement("w:r")
+    fld_begin = OxmlElement("w:fldChar")
+    fld_begin.set(qn("w:fldCharType"), "begin")
+    fld_begin_r.append(fld_begin)
+    toc_p.append(fld_begin_r)
+
+    # Field instruction (bookmark set per entry)
+    fld_instr_r = OxmlElement("w:r")
+    fld_instr = OxmlElement("w:instrText")
+    fld_instr.set(qn("xml:space"), "preserve")
+    fld_instr_r.append(fld_instr)
+    toc_p.append(fld_instr_r)
+
+    # Field separate
+    fld_sep_r = OxmlElement("w:r")
+    fld_sep = OxmlElement("w:fldChar")
+    fld_sep.set(qn("w:fldCharType"), "separate")
+    fld_sep_r.append(fld_sep)
+    toc_p.append(fld_sep_r)
+
+    # Placeholder page number (Word replaces this on open)
+    pn_r = OxmlElement("w:r")
+    pn_t = OxmlElement("w:t")
+    pn_t.text = "0"
+    pn_r.append(pn_t)
+    toc_p.append(pn_r)
+
+    # Field end
+    fld_end_r = OxmlElement("w:r")
+    fld_end = OxmlElement("w:fldChar")
+    fld_end.set(qn("w:fldCharType"), "end")
+    fld_end_r.append(fld_end)
+    toc_p.append(fld_end_r)
+
+    return toc_p
+
+
 def update_toc_entries(document: Document, headings: list):
     """
     Find the TOC field in the document and insert entries with PAGEREF
@@ -593,78 +796,13 @@ def update_toc_entries(document: Document, headings: list):
         insert_idx = list(parent).index(para) + 1
 
         for level, heading_text, bookmark_name in headings:
-            toc_p = OxmlElement("w:p")
-            toc_ppr = OxmlElement("w:pPr")
-            toc_style = OxmlElement("w:pStyle")
-            toc_style.set(qn("w:val"), f"TOC{level}" if level <= 3 else "TOC1")
-            toc_ppr.append(toc_style)
-
-            tabs = OxmlElement("w:tabs")
-            tab = OxmlElement("w:tab")
-            tab.set(qn("w:val"), "right")
-            tab.set(qn("w:leader"), "dot")
-            tab.set(qn("w:pos"), "9360")
-            tabs.append(tab)
-            toc_ppr.append(tabs)
-
-            if level > 1:
-                ind = OxmlElement("w:ind")
-                ind.set(qn("w:left"), str((level - 1) * 240))
-                toc_ppr.append(ind)
-
-            toc_p.append(toc_ppr)
-
-            # Heading text run
-            toc_r = OxmlElement("w:r")
-            toc_t = OxmlElement("w:t")
-            toc_t.text = heading_text
-            toc_r.append(toc_t)
-            toc_p.append(toc_r)
-
-            # Tab character (triggers dot leader)
-            tab_r = OxmlElement("w:r")
-            tab_t = OxmlElement("w:t")
-            tab_t.set(qn("xml:space"), "preserve")
-            tab_t.text = "\t"
-            tab_r.append(tab_t)
-            toc_p.append(tab_r)
-
-            # PAGEREF field code → resolves to real page number
-            # Field begin
-            fld_begin_r = OxmlElement("w:r")
-            fld_begin = OxmlElement("w:fldChar")
-            fld_begin.set(qn("w:fldCharType"), "begin")
-            fld_begin_r.append(fld_begin)
-            toc_p.append(fld_begin_r)
-
-            # Field instruction
-            fld_instr_r = OxmlElement("w:r")
-            fld_instr = OxmlElement("w:instrText")
-            fld_instr.set(qn("xml:space"), "preserve")
-            fld_instr.text = f" PAGEREF {bookmark_name} \\h "
-            fld_instr_r.append(fld_instr)
-            toc_p.append(fld_instr_r)
-
-            # Field separate
-            fld_sep_r = OxmlElement("w:r")
-            fld_sep = OxmlElement("w:fldChar")
-            fld_sep.set(qn("w:fldCharType"), "separate")
-            fld_sep_r.append(fld_sep)
-            toc_p.append(fld_sep_r)
-
-            # Placeholder page number (Word replaces this on open)
-            pn_r = OxmlElement("w:r")
-            pn_t = OxmlElement("w:t")
-            pn_t.text = "0"
-            pn_r.append(pn_t)
-            toc_p.append(pn_r)
-
-            # Field end
-            fld_end_r = OxmlElement("w:r")
-            fld_end = OxmlElement("w:fldChar")
-            fld_end.set(qn("w:fldCharType"), "end")
-            fld_end_r.append(fld_end)
-            toc_p.append(fld_end_r)
+            # Copy the prebuilt entry for this level and fill in its two
+            # variable parts: the heading text and the PAGEREF target
+            toc_p = deepcopy(_toc_entry_template(level))
+            toc_p.find(qn("w:r")).find(qn("w:t")).text = heading_text
+            toc_p.find(f"{qn('w:r')}/{qn('w:instrText')}").text = (
+                f" PAGEREF {bookmark_name} \\h "
+            )
 
             parent.insert(insert_idx, toc_p)
             insert_idx += 1
@@ -782,7 +920,7 @@ def _patch_toc_page_numbers(document: Document, page_map: dict):
             instr = run.find(qn("w:instrText"))
             if instr is not None and "PAGEREF" in (instr.text or ""):
                 # Extract bookmark name from "PAGEREF _TocXxx \h"
-                match = re.search(r"PAGEREF\s+(\S+)", instr.text)
+                match = _PAGEREF_RE.search(instr.text)
                 if match:
                     pageref_bookmark = match.group(1)
 
@@ -817,8 +955,10 @@ def update_status_to_false(bucket_name, object_key):
         for tier in data.values():
             if isinstance(tier, dict) and "status" in tier:
                 tier["status"] = False
+        # Machine-read file: compact separators, no indentation
         s3.put_object(Bucket=bucket_name, Key=object_key,
-                      Body=json.dumps(data, indent=2).encode("utf-8"))
+                      Body=json.dumps(data, separators=(",", ":")).encode("utf-8"),
+                      ContentType="application/json")
         print("✅ Status updated")
     except Exception as e:
         print(f"❌ Status update error: {e}")
@@ -854,6 +994,7 @@ def lambda_handler(event, context):
 
     # ── 2. Load template JSON ─────────────────────────────────
     template = read_json_from_s3(template_bucket, template_key)
+    _load_docx()
 
     # ── 3. Load DOCX template from S3 ────────────────────────
     document = load_template_from_s3(
@@ -881,6 +1022,7 @@ def lambda_handler(event, context):
     toc_headings = []  # (level, text, bookmark_name) for TOC population
     bookmark_counter = 100  # Start IDs high to avoid conflicts
 
+    subsections = []
     for section in template:
         for subsection in section.get("sections", []):
             subheading = format_heading(subsection.get("subheading", ""))
@@ -891,21 +1033,26 @@ def lambda_handler(event, context):
                     f"s3://cammi-devprod/{project_id}/{document_type}/{s3_path}"
                 )
 
-            content_text = read_text_file_from_s3(s3_path)
+            subsections.append((subheading, s3_path))
 
-            # Add section heading with bookmark for TOC PAGEREF
-            bm_name = _make_bookmark_id(subheading, bookmark_counter)
-            add_heading_with_bookmark(
-                document, subheading, STYLE_HEADING1,
-                bm_name, bookmark_counter
-            )
-            toc_headings.append((1, subheading, bm_name))
-            bookmark_counter += 1
+    # Fetch every subsection's content in parallel (order is preserved)
+    contents = executor.map(read_text_file_from_s3,
+                            [s3_path for _, s3_path in subsections])
 
-            # Add formatted content
-            add_formatted_paragraphs(
-                document, content_text, template_h1=subheading
-            )
+    for (subheading, _), content_text in zip(subsections, contents):
+        # Add section heading with bookmark for TOC PAGEREF
+        bm_name = _make_bookmark_id(subheading, bookmark_counter)
+        add_heading_with_bookmark(
+            document, subheading, STYLE_HEADING1,
+            bm_name, bookmark_counter
+        )
+        toc_headings.append((1, subheading, bm_name))
+        bookmark_counter += 1
+
+        # Add formatted content
+        add_formatted_paragraphs(
+            document, content_text, template_h1=subheading
+        )
 
     # ── 6b. Populate TOC with collected headings ──────────────
     if toc_headings:
@@ -921,7 +1068,6 @@ def lambda_handler(event, context):
     buffer = BytesIO()
     document.save(buffer)
     buffer.seek(0)
-    doc_bytes = buffer.getvalue()
 
     common_metadata = {
         "user_id":       user_id,
@@ -933,24 +1079,43 @@ def lambda_handler(event, context):
         ".wordprocessingml.document"
     )
 
-    for key in [output_key, knowledgebase_output]:
-        s3.put_object(
-            Bucket=output_bucket, Key=key,
-            Body=doc_bytes, Metadata=common_metadata,
-            ContentType=content_type,
-        )
+    # ── 7b. Post-save writes ─────────────────────────────────
+    # Only the DOCX upload must finish first (the copy, history row and
+    # pointer all reference it, and the status reset tells the frontend
+    # the document is ready); everything after it runs concurrently.
 
-    # ── 8. Log history ────────────────────────────────────────
-    save_document_history_to_dynamodb(
-        user_id=user_id,
-        project_id=project_id,
-        document_type=document_type,
-        document_name=output_key.split("/")[-1],
-        document_url=f"s3://{output_bucket}/{output_key}",
+    # Upload once, straight from the buffer (no bytes copy); the
+    # knowledgebase copy is made server-side
+    s3.upload_fileobj(
+        buffer, output_bucket, output_key,
+        ExtraArgs={"Metadata": common_metadata, "ContentType": content_type},
     )
-
-    # ── 9. Update execution plan status ──────────────────────
-    update_status_to_false(bucket_name="cammi-devprod", object_key=object_key)
+    post_save = [
+        executor.submit(
+            s3.copy_object,
+            Bucket=output_bucket, Key=knowledgebase_output,
+            CopySource={"Bucket": output_bucket, "Key": output_key},
+            Metadata=common_metadata, MetadataDirective="REPLACE",
+            ContentType=content_type,
+        ),
+        # ── 8. Log history ──
+        executor.submit(
+            save_document_history_to_dynamodb,
+            user_id=user_id,
+            project_id=project_id,
+            document_type=document_type,
+            document_name=output_key.split("/")[-1],
+            document_url=f"s3://{output_bucket}/{output_key}",
+        ),
+        executor.submit(save_latest_docx_pointer, project_id, document_type, output_key),
+        # ── 9. Update execution plan status ──
+        executor.submit(
+            update_status_to_false, bucket_name="cammi-devprod", object_key=object_key
+        ),
+    ]
+    # Re-raises a failed copy; the other helpers log and swallow their errors
+    for future in post_save:
+        future.result()
 
     return {
         "statusCode": 200,
@@ -1,7 +1,7 @@
 import json, os
+import base64
 import boto3
 import urllib3
-from boto3.dynamodb.conditions import Attr
 from decimal import Decimal
 
 # Custom JSON encoder to handle Decimal types
@@ -14,7 +14,12 @@ class DecimalEncoder(json.JSONEncoder):
 # AWS clients
 s3 = boto3.client("s3")
 dynamodb = boto3.resource("dynamodb")
-http = urllib3.PoolManager()
+# Keep-alive pool so warm invocations reuse the ConvertAPI TLS session
+http = urllib3.PoolManager(
+    num_pools=2,
+    maxsize=4,
+    headers={"Connection": "keep-alive"}
+)
 
 # Hardcoded config
 USERS_TABLE = "users-table"
@@ -35,6 +40,14 @@ CORS_HEADERS = {
 # Credit cost for this operation
 CREDIT_COST = 2
 
+# Lifetime of the pre-signed PDF download link (seconds)
+PDF_URL_EXPIRES = 3600
+
+# The ConvertAPI body is a one-shot stream, so urllib3 must not retry it on its
+# own (a retry would re-send an empty/truncated body); failed sends are retried
+# here with a freshly opened stream instead
+CONVERT_ATTEMPTS = 2
+
 # DynamoDB tables
 users_table = dynamodb.Table(USERS_TABLE)
 project_state_table = dynamodb.Table(PROJECT_STATE_TABLE)
@@ -61,7 +74,8 @@ def lambda_handler(event, context):
         ExpressionAttributeValues={
             ":session_id": session_id
         },
-        ProjectionExpression="email, total_credits"
+        ProjectionExpression="email, total_credits",
+        Limit=1
     )
 
     if "Items" not in user_resp or len(user_resp["Items"]) == 0:
@@ -118,41 +132,86 @@ def lambda_handler(event, context):
     # Build S3 folder prefix
     folder_prefix = f"project/{project_id}/{document_type}/marketing_strategy_document/"
 
-    # Find .docx files in S3
-    response = s3.list_objects_v2(Bucket=BUCKET_NAME, Prefix=folder_prefix)
-    docx_files = [obj for obj in response.get("Contents", []) if obj["Key"].endswith(".docx")]
+    # Latest DOCX key recorded by the generators; documents generated before
+    # the pointer existed fall back to listing the folder
+    docx_key = project_resp["Item"].get(f"latest_docx_{document_type}")
 
-    if not docx_files:
-        return {
-            "statusCode": 404,
-            "body": json.dumps({"error": "No .docx files found"}),
-            "headers": CORS_HEADERS,
-        }
+    if not docx_key:
+        response = s3.list_objects_v2(Bucket=BUCKET_NAME, Prefix=folder_prefix)
+        docx_files = [obj for obj in response.get("Contents", []) if obj["Key"].endswith(".docx")]
 
-    # Pick latest file
-    latest_file = max(docx_files, key=lambda x: x["LastModified"])
-    docx_key = latest_file["Key"]
+        if not docx_files:
+            return {
+                "statusCode": 404,
+                "body": json.dumps({"error": "No .docx files found"}),
+                "headers": CORS_HEADERS,
+            }
 
-    # Read file from S3
-    s3_object = s3.get_object(Bucket=BUCKET_NAME, Key=docx_key)
-    file_bytes = s3_object["Body"].read()
+        # Pick latest file
+        latest_file = max(docx_files, key=lambda x: x["LastModified"])
+        docx_key = latest_file["Key"]
 
-    # Multipart form build
+    # Stream the file from S3 straight into the multipart body (chunked),
+    # so the DOCX is never held in memory as one concatenated payload
     boundary = "----LambdaBoundary"
-    body_multipart = (
+    part_head = (
         f"--{boundary}\r\n"
         f'Content-Disposition: form-data; name="File"; filename="{docx_key}"\r\n'
         f"Content-Type: application/vnd.openxmlformats-officedocument.wordprocessingml.document\r\n\r\n"
-    ).encode("utf-8") + file_bytes + f"\r\n--{boundary}--\r\n".encode("utf-8")
+    ).encode("utf-8")
+    part_tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+    def multipart_body():
+        # Opens its own S3 stream, so every attempt sends the whole file
+        s3_object = s3.get_object(Bucket=BUCKET_NAME, Key=docx_key)
+        yield part_head
+        yield from s3_object["Body"].iter_chunks(chunk_size=64 * 1024)
+        yield part_tail
 
     headers_req = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
 
-    # Call ConvertAPI
-    response = http.request("POST", CONVERTAPI_URL, body=body_multipart, headers=headers_req)
+    # Call ConvertAPI (a stale keep-alive connection fails the send; retry
+    # with a fresh body rather than letting urllib3 replay a spent stream)
+    for attempt in range(1, CONVERT_ATTEMPTS + 1):
+        try:
+            response = http.request(
+                "POST", CONVERTAPI_URL,
+                body=multipart_body(), headers=headers_req, chunked=True,
+                retries=False
+            )
+            break
+        except urllib3.exceptions.HTTPError as e:
+            print(f"❌ ConvertAPI request failed (attempt {attempt}): {e}")
+            if attempt == CONVERT_ATTEMPTS:
+                return {
+                    "statusCode": 502,
+                    "body": json.dumps({"error": "Conversion service unavailable", "details": str(e)}),
+                    "headers": CORS_HEADERS,
+                }
     result = json.loads(response.data.decode("utf-8"))
 
     # Check if conversion was successful before deducting credits
     if "Files" in result and "FileData" in result["Files"][0]:
+        # Store the PDF next to the DOCX and hand back a pre-signed link,
+        # keeping the response small (no base64 body near the 6MB API cap)
+        pdf_key = docx_key.replace(".docx", ".pdf")
+        pdf_file_name = pdf_key.split("/")[-1]
+        s3.put_object(
+            Bucket=BUCKET_NAME,
+            Key=pdf_key,
+            Body=base64.b64decode(result["Files"][0]["FileData"]),
+            ContentType="application/pdf"
+        )
+        pdf_url = s3.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": BUCKET_NAME,
+                "Key": pdf_key,
+                "ResponseContentDisposition": f'attachment; filename="{pdf_file_name}"'
+            },
+            ExpiresIn=PDF_URL_EXPIRES
+        )
+
         # Deduct credits only on successful conversion
         try:
             new_credit_balance = total_credits - CREDIT_COST
@@ -166,7 +225,12 @@ def lambda_handler(event, context):
                 }
             )
         except Exception as e:
-            # Handle potential race condition where credits changed
+            # Handle potential race condition where credits changed; the
+            # unpaid PDF must not stay behind at its predictable key
+            try:
+                s3.delete_object(Bucket=BUCKET_NAME, Key=pdf_key)
+            except Exception as cleanup_error:
+                print(f"❌ PDF cleanup failed for {pdf_key}: {cleanup_error}")
             return {
                 "statusCode": 409,
                 "body": json.dumps({
@@ -176,14 +240,11 @@ def lambda_handler(event, context):
                 "headers": CORS_HEADERS,
             }
 
-        base64_pdf = result["Files"][0]["FileData"]
-        pdf_file_name = docx_key.replace(".docx", ".pdf").split("/")[-1]
-
         return {
             "statusCode": 200,
             "body": json.dumps({
                 "fileName": pdf_file_name,
-                "base64_pdf": base64_pdf,
+                "url": pdf_url,
                 "credits_deducted": CREDIT_COST,
                 "remaining_credits": new_credit_balance
             }, cls=DecimalEncoder),  # Use custom encoder for Decimal objects
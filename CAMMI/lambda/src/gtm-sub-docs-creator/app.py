@@ -6,28 +6,89 @@ AWS Lambda: Build marketing DOCX from S3 template + content
 - Keep headings, bullets, and Label:Value formatting
 """
 import uuid 
+import time
 import boto3
 import base64
 from boto3.dynamodb.conditions import Key
+from boto3.s3.transfer import TransferConfig
 import json
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from docx import Document
 from docx.shared import Pt, RGBColor
+from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
-from datetime import datetime
+from datetime import datetime, timezone
 import re
-import difflib
+from functools import lru_cache
 
 # ---------- AWS ----------
-s3 = boto3.client('s3')
+# Keep-alive connections reused across calls and warm invocations
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=16,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    connect_timeout=2,
+    read_timeout=10
+)
+s3 = boto3.client('s3', config=BOTO_CONFIG)
+# DOCX uploads stream from the in-memory buffer; multipart above 8 MB
+UPLOAD_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    max_concurrency=4,
+    use_threads=True
+)
 # DynamoDB resource (initialize globally)
-dynamodb = boto3.resource('dynamodb')
+dynamodb = boto3.resource('dynamodb', config=BOTO_CONFIG)
 DOCUMENT_HISTORY_TABLE = "documents-history-table"
+PROJECT_STATE_TABLE = "project-state-table"
 users_table = dynamodb.Table("users-table")
 
+# Section bodies are fetched concurrently; one pool per container, sized to
+# the client's connection pool
+executor = ThreadPoolExecutor(max_workers=16)
+
 # ---------- CONFIG ----------
 TABLE_STYLE = "Light Grid Accent 1"
+# The response always carries a pre-signed URL; the base64 copy is only
+# inlined for files up to DOCX_INLINE_MAX_BYTES (API Gateway caps at 6 MB)
+DOCX_URL_EXPIRES = 900
+DOCX_INLINE_MAX_BYTES = 1024 * 1024
+
+# ---------- Base document ----------
+# python-docx's default template with the Normal style set to Arial 12pt,
+# built once per container; each invocation opens a fresh copy from bytes.
+def _build_base_docx() -> bytes:
+    base = Document()
+    style = base.styles['Normal']
+    style.font.name = 'Arial'
+    style.font.size = Pt(12)
+    buf = BytesIO()
+    base.save(buf)
+    return buf.getvalue()
+
+_BASE_DOCX_BYTES = _build_base_docx()
+
+# ---------- Regex (compiled once per container) ----------
+_SEP_RE = re.compile(r'^\s*\|?\s*:?-{3,}\s*(\|\s*:?-{3,}\s*)+\|?\s*$')
+_MULTI_NL = re.compile(r'\n{3,}')
+_WS_RE = re.compile(r'[ \t]+')
+_SPACES_RE = re.compile(r'\s+')
+_NONALNUM_RE = re.compile(r'[^a-z0-9 ]+')
+
+# unbreak_paragraphs: line starts that mark a bullet, line ends that close a sentence
+_BULLET_CHARS = frozenset("-*•")
+_END_CHARS = frozenset('.:?!"”')
+
+# _normalize_heading fast path: printable ASCII -> lowercase a-z0-9 and space,
+# everything else deleted, in one str.translate pass
+_HEADING_KEEP = frozenset("abcdefghijklmnopqrstuvwxyz0123456789 ")
+_HEADING_TRANS = {
+    c: (chr(c).lower() if chr(c).lower() in _HEADING_KEEP else None)
+    for c in range(128)
+}
 
 # ---------- CORS HEADERS ----------
 CORS_HEADERS = {
@@ -37,10 +98,28 @@ CORS_HEADERS = {
     'Access-Control-Max-Age': '3600'
 }
 
+# ---------- Session cache ----------
+# Warm containers reuse resolved session_id → user_id mappings for
+# SESSION_CACHE_TTL seconds instead of querying users-table every time.
+SESSION_CACHE_TTL = 300
+SESSION_CACHE_MAX_ENTRIES = 1024
+_SESSION_CACHE = {}
+
+# ---------- Template cache ----------
+# marketing_document_template.json changes rarely; warm containers keep it
+# per document_type for TEMPLATE_CACHE_TTL seconds.
+TEMPLATE_CACHE_TTL = 600
+_TEMPLATE_CACHE = {}
+
+
 def get_user_id_from_session(session_id: str):
     """
     Fetch user_id from DynamoDB Users table using GSI: session_id-index
     """
+    cached = _SESSION_CACHE.get(session_id)
+    if cached and cached[0] > time.time():
+        return cached[1]
+
     try:
         response = users_table.query(
             IndexName="session_id-index",
@@ -52,7 +131,12 @@ def get_user_id_from_session(session_id: str):
             raise Exception(f"No user found for session_id: {session_id}")
 
         # Assuming your table has a field "id" which represents user_id
-        return items[0].get("id")
+        user_id = items[0].get("id")
+        if user_id:
+            if len(_SESSION_CACHE) >= SESSION_CACHE_MAX_ENTRIES:
+                _SESSION_CACHE.clear()
+            _SESSION_CACHE[session_id] = (time.time() + SESSION_CACHE_TTL, user_id)
+        return user_id
 
     except Exception as e:
         print(f"Error fetching user_id for session_id={session_id}: {str(e)}")
@@ -69,7 +153,7 @@ def save_document_history_to_dynamodb_old(user_id, project_id, document_type, do
         table = dynamodb.Table(DOCUMENT_HISTORY_TABLE)
 
         document_type_uuid = f"{document_type}#{uuid.uuid4()}"
-        created_at = datetime.utcnow().isoformat()
+        created_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
 
         item = {
             "user_id": user_id,
@@ -93,6 +177,18 @@ def save_document_history_to_dynamodb_old(user_id, project_id, document_type, do
         print(f"❌ Unexpected error while saving document history: {e}")
         return False
 
+def save_document_history_batch(items):
+    """
+    Write history rows through batch_writer: 25 items per BatchWriteItem,
+    with boto3 resubmitting any UnprocessedItems. Callers that produce
+    several documents per event should collect the rows and call this once.
+    """
+    table = dynamodb.Table(DOCUMENT_HISTORY_TABLE)
+    with table.batch_writer(overwrite_by_pkeys=["user_id", "document_type_uuid"]) as writer:
+        for item in items:
+            writer.put_item(Item=item)
+
+
 def save_document_history_to_dynamodb(user_id, project_id, document_type, document_name, document_url):
     try:
         table = dynamodb.Table(DOCUMENT_HISTORY_TABLE)
@@ -113,7 +209,7 @@ def save_document_history_to_dynamodb(user_id, project_id, document_type, docume
 
         # 3️⃣ Insert new item
         document_type_uuid = f"{document_type}#{uuid.uuid4()}"
-        created_at = datetime.utcnow().isoformat()
+        created_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
 
         item = {
             "user_id": user_id,
@@ -126,7 +222,7 @@ def save_document_history_to_dynamodb(user_id, project_id, document_type, docume
             "show_flag": show_flag
         }
 
-        table.put_item(Item=item)
+        save_document_history_batch([item])
 
         print(f"✅ Document history saved: {document_type_uuid}, show_flag={show_flag}")
         return True
@@ -138,6 +234,22 @@ def save_document_history_to_dynamodb(user_id, project_id, document_type, docume
         print(f"❌ Unexpected error: {e}")
         return False
         
+def save_latest_docx_pointer(project_id, document_type, docx_key):
+    """Point project-state-table at the DOCX just written (read by download-as-pdf)."""
+    try:
+        dynamodb.Table(PROJECT_STATE_TABLE).update_item(
+            Key={"project_id": project_id},
+            UpdateExpression="SET #latest = :key",
+            ConditionExpression="attribute_exists(project_id)",
+            ExpressionAttributeNames={"#latest": f"latest_docx_{document_type.lower()}"},
+            ExpressionAttributeValues={":key": docx_key}
+        )
+        return True
+    except Exception as e:
+        print(f"❌ Latest DOCX pointer not saved: {e}")
+        return False
+
+
 # ---------- Helpers: formatting ----------
 def apply_base_format(run, size=12, bold=False):
     run.font.name = 'Arial'
@@ -145,6 +257,43 @@ def apply_base_format(run, size=12, bold=False):
     run.font.size = Pt(size)
     run.bold = bold
 
+def _set_cell(cell, text, size, bold):
+    """
+    Write `text` into a table cell as one Arial run, building the
+    <w:p>/<w:r>/<w:t> subtree directly (same XML as cell.text followed by
+    apply_base_format, without the second pass over the runs).
+    """
+    tc = cell._tc
+    tc.clear_content()
+
+    rFonts = OxmlElement('w:rFonts')
+    rFonts.set(qn('w:ascii'), 'Arial')
+    rFonts.set(qn('w:hAnsi'), 'Arial')
+    rFonts.set(qn('w:eastAsia'), 'Arial')
+    b = OxmlElement('w:b')
+    if not bold:
+        b.set(qn('w:val'), '0')
+    sz = OxmlElement('w:sz')
+    sz.set(qn('w:val'), str(size * 2))
+
+    rPr = OxmlElement('w:rPr')
+    rPr.append(rFonts)
+    rPr.append(b)
+    rPr.append(sz)
+
+    t = OxmlElement('w:t')
+    t.text = text
+    if text != text.strip():
+        t.set(qn('xml:space'), 'preserve')
+
+    r = OxmlElement('w:r')
+    r.append(rPr)
+    r.append(t)
+    p = OxmlElement('w:p')
+    p.append(r)
+    tc.append(p)
+
+@lru_cache(maxsize=256)
 def format_heading(text: str) -> str:
     return ' '.join(word.capitalize() for word in text.replace("_", " ").split())
 
@@ -152,8 +301,8 @@ def format_heading(text: str) -> str:
 def clean_text(text: str) -> str:
     text = text.replace('\r\n', '\n').replace('\r', '\n')
     # don't collapse single newlines (tables depend on line structure)
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    text = re.sub(r'[ \t]+', ' ', text)
+    text = _MULTI_NL.sub('\n\n', text)
+    text = _WS_RE.sub(' ', text)
     return text.strip()
 
 def unbreak_paragraphs(text: str) -> str:
@@ -161,43 +310,36 @@ def unbreak_paragraphs(text: str) -> str:
     Groups soft-wrapped lines into paragraphs — BUT this should NOT
     run on blocks that contain Markdown tables (we guard for that upstream).
     """
-    lines = text.splitlines()
     result = []
-    buffer = ""
+    parts = []  # pieces of the paragraph being built, joined once on flush
+    last = ""   # last character of that paragraph
 
-    for line in lines:
+    for line in text.splitlines():
         stripped = line.strip()
 
         if not stripped:
-            if buffer:
-                result.append(buffer.strip())
-                buffer = ""
+            if parts:
+                result.append("".join(parts))
+                parts = []
             continue
 
         # bullets are separate
-        if stripped.startswith(("-", "*", "•")):
-            if buffer:
-                result.append(buffer.strip())
-                buffer = ""
-            result.append(stripped)
-            continue
-
         # "Label: Value" lines are separate
-        if ':' in stripped and not stripped.endswith(':'):
-            if buffer:
-                result.append(buffer.strip())
-                buffer = ""
+        if stripped[0] in _BULLET_CHARS or (':' in stripped and stripped[-1] != ':'):
+            if parts:
+                result.append("".join(parts))
+                parts = []
             result.append(stripped)
             continue
 
         # normal line join
-        if buffer and not buffer.endswith(('.', ':', '?', '!', '"', '"')):
-            buffer += " " + stripped
-        else:
-            buffer += ("\n" if buffer else "") + stripped
+        if parts:
+            parts.append("\n" if last in _END_CHARS else " ")
+        parts.append(stripped)
+        last = stripped[-1]
 
-    if buffer:
-        result.append(buffer.strip())
+    if parts:
+        result.append("".join(parts))
 
     return "\n\n".join(result)
 
@@ -207,10 +349,16 @@ def read_json_from_s3(bucket, key):
     content = response['Body'].read().decode('utf-8')
     return json.loads(content)
 
+def separator_flags(lines):
+    """is_sep[i] is True when lines[i] is a Markdown table separator row (|---|---|)."""
+    return [("-" in line and _SEP_RE.match(line) is not None) for line in lines]
+
 def read_text_file_from_s3(s3_path):
     """
-    Reads UTF-8 text. If it contains a Markdown table, we DO NOT run
-    unbreak_paragraphs() (to preserve row lines). Otherwise, we do.
+    Reads UTF-8 text and returns (lines, is_sep): the cleaned, stripped lines,
+    ready for add_formatted_paragraphs, and their separator_flags. If it contains a
+    Markdown table, we DO NOT run unbreak_paragraphs() (to preserve row
+    lines). Otherwise, we do.
     """
     try:
         s3_path = s3_path.replace("s3://", "")
@@ -219,35 +367,41 @@ def read_text_file_from_s3(s3_path):
         response = s3.get_object(Bucket=bucket, Key=key)
         raw_text = response['Body'].read().decode('utf-8').strip()
         if not raw_text:
-            return "[Content missing]"
+            return ["[Content missing]"], [False]
 
         cleaned = clean_text(raw_text)
 
         # Detect GitHub-style Markdown table: header + separator row like |---|
-        lines = cleaned.split("\n")
-        has_md_table = False
-        sep_re = re.compile(r'^\s*\|?\s*:?-{3,}\s*(\|\s*:?-{3,}\s*)+\|?\s*$')
-
-        for i in range(len(lines) - 1):
-            if "|" in lines[i] and sep_re.match(lines[i + 1] or ""):
-                has_md_table = True
-                break
+        # (the flags are reused by the renderer, so each line is matched once)
+        lines = [line.strip() for line in cleaned.split("\n")]
+        is_sep = separator_flags(lines)
+        has_md_table = any(
+            sep and "|" in line
+            for line, sep in zip(lines, is_sep[1:])
+        )
 
         # Only unbreak when there's no table (tables rely on exact line structure)
         if has_md_table:
-            return cleaned
+            return lines, is_sep
         else:
-            return unbreak_paragraphs(cleaned)
+            # unbreak_paragraphs already emits stripped lines
+            lines = unbreak_paragraphs(cleaned).split("\n")
+            return lines, separator_flags(lines)
 
     except ClientError as e:
         if e.response['Error']['Code'] == 'NoSuchKey':
-            return "[Content missing]"
+            return ["[Content missing]"], [False]
         raise e
 
 # ---------- Exact heading matching (skip duplicate H1s inside content) ----------
+@lru_cache(maxsize=512)
 def _normalize_heading(s: str) -> str:
-    s = re.sub(r'\s+', ' ', s).strip().lower()
-    s = re.sub(r'[^a-z0-9 ]+', '', s)
+    # Printable ASCII has no whitespace besides " ", so split/join collapses
+    # exactly what _SPACES_RE would; anything else takes the regex path
+    if s.isascii() and s.isprintable():
+        return " ".join(s.split()).translate(_HEADING_TRANS)
+    s = _SPACES_RE.sub(' ', s).strip().lower()
+    s = _NONALNUM_RE.sub('', s)
     return s
 
 def exact_match(a: str, b: str) -> bool:
@@ -259,26 +413,21 @@ def exact_match(a: str, b: str) -> bool:
     return na == nb
 
 # ---------- Markdown table -> real DOCX table ----------
-def markdown_table_to_docx(md_table: str, doc: Document):
-    lines = [line.strip() for line in md_table.strip().split("\n") if line.strip()]
-    if len(lines) < 2:
-        return
-
-    # First non-empty line is header; skip the next separator row(s)
-    header = [h.strip() for h in lines[0].split("|") if h.strip()]
+def markdown_table_to_docx(header_line: str, row_lines: list, doc: Document):
+    """
+    header_line is the table's header row; row_lines are its body rows with
+    separator lines already dropped by the caller.
+    """
+    header = [h.strip() for h in header_line.split("|") if h.strip()]
     if not header:
         return
 
-    # Build rows (skip separator lines)
+    # Build rows
     rows = []
-    sep_re = re.compile(r'^\s*\|?\s*:?-{3,}\s*(\|\s*:?-{3,}\s*)+\|?\s*$')
-    for line in lines[1:]:
-        if sep_re.match(line):
-            continue
-        if "|" in line:
-            row = [c.strip() for c in line.split("|") if c.strip()]
-            if row:
-                rows.append(row)
+    for line in row_lines:
+        row = [c.strip() for c in line.split("|") if c.strip()]
+        if row:
+            rows.append(row)
 
     table = doc.add_table(rows=len(rows) + 1, cols=len(header))
     try:
@@ -289,24 +438,18 @@ def markdown_table_to_docx(md_table: str, doc: Document):
 
     # header
     for j, h in enumerate(header):
-        cell = table.cell(0, j)
-        cell.text = h
-        for paragraph in cell.paragraphs:
-            for run in paragraph.runs:
-                apply_base_format(run, size=11, bold=True)
+        _set_cell(table.cell(0, j), h, size=11, bold=True)
 
     # body
     for i, row in enumerate(rows):
         for j, txt in enumerate(row):
-            cell = table.cell(i + 1, j)
-            cell.text = txt
-            for paragraph in cell.paragraphs:
-                for run in paragraph.runs:
-                    apply_base_format(run, size=10, bold=False)
+            _set_cell(table.cell(i + 1, j), txt, size=10, bold=False)
 
 # ---------- Content renderer ----------
-def add_formatted_paragraphs(document: Document, text: str, template_h1: str = ""):
+def add_formatted_paragraphs(document: Document, lines: list, is_sep: list, template_h1: str = ""):
     """
+    `lines` and `is_sep` are the cleaned, split content and its separator
+    flags from read_text_file_from_s3 (lines arrive already stripped).
     - Auto-detects GitHub-style Markdown tables (header + --- separator)
     - Converts them into real DOCX tables
     - Recognizes markdown headings (#, ##, ###)
@@ -314,11 +457,9 @@ def add_formatted_paragraphs(document: Document, text: str, template_h1: str = "
     - Bullets: -, *, •
     - "Label:" or "Label: Value" → bold label
     """
-    text = clean_text(text)
-    lines = text.split("\n")
-
     i = 0
-    sep_re = re.compile(r'^\s*\|?\s*:?-{3,}\s*(\|\s*:?-{3,}\s*)+\|?\s*$')
+    # normalized once per call; H1 lines compare against it directly
+    template_norm = _normalize_heading(template_h1) if template_h1 else ""
 
     def flush_table_from(start_idx):
         """
@@ -326,36 +467,35 @@ def add_formatted_paragraphs(document: Document, text: str, template_h1: str = "
           header line
           one or more separator lines
           subsequent lines with pipes (rows)
-        Return (end_idx_exclusive, md_table_string)
+        Return (end_idx_exclusive, row_lines) with separator lines dropped
         """
-        header_line = lines[start_idx].strip()
         j = start_idx + 1
 
         # must have at least one separator line
-        if j >= len(lines) or not sep_re.match(lines[j].strip()):
+        if j >= len(lines) or not is_sep[j]:
             return start_idx, None
 
-        buf = [header_line]
-        # include all consecutive separator lines (rare but allowed)
-        while j < len(lines) and sep_re.match(lines[j].strip()):
-            buf.append(lines[j].strip())
+        # skip all consecutive separator lines (rare but allowed)
+        while j < len(lines) and is_sep[j]:
             j += 1
 
         # include table rows: lines that contain at least one pipe
+        row_lines = []
         while j < len(lines) and '|' in lines[j]:
-            buf.append(lines[j].strip())
+            if not is_sep[j]:
+                row_lines.append(lines[j])
             j += 1
 
-        return j, "\n".join(buf)
+        return j, row_lines
 
     while i < len(lines):
-        line = lines[i].strip()
+        line = lines[i]
 
         # try table detection first (header + separator)
-        if "|" in line and (i + 1) < len(lines) and sep_re.match(lines[i + 1].strip()):
-            end_idx, md_table = flush_table_from(i)
-            if md_table:
-                markdown_table_to_docx(md_table, document)
+        if "|" in line and (i + 1) < len(lines) and is_sep[i + 1]:
+            end_idx, row_lines = flush_table_from(i)
+            if row_lines is not None:
+                markdown_table_to_docx(line, row_lines, document)
                 document.add_paragraph()
                 i = end_idx
                 continue  # next line after table
@@ -385,7 +525,7 @@ def add_formatted_paragraphs(document: Document, text: str, template_h1: str = "
         # H1 (skip if identical to template heading)
         if line.startswith("# "):
             h1_text = line[2:].strip()
-            if not (template_h1 and exact_match(h1_text, template_h1)):
+            if not (template_h1 and _normalize_heading(h1_text) == template_norm):
                 p = document.add_paragraph()
                 run = p.add_run(h1_text)
                 apply_base_format(run, size=17, bold=True)
@@ -485,55 +625,63 @@ def lambda_handler(event, context):
         template_key = f'flow/{document_type}/marketing_document_template.json'
         output_bucket = 'cammi-devprod'
 
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
         output_key = f'project/{project_id}/{document_type}/marketing_strategy_document/{document_type}.docx'
 
-        # Load template JSON
-        template = read_json_from_s3(template_bucket, template_key)
-
-        # Build DOCX
-        document = Document()
+        # Load template JSON (cached per document_type)
+        cached = _TEMPLATE_CACHE.get(document_type)
+        if cached and cached[0] > time.time():
+            template = cached[1]
+        else:
+            template = read_json_from_s3(template_bucket, template_key)
+            _TEMPLATE_CACHE[document_type] = (time.time() + TEMPLATE_CACHE_TTL, template)
 
-        # Default font
-        style = document.styles['Normal']
-        style.font.name = 'Arial'
-        style.font.size = Pt(12)
+        # Build DOCX (Normal style is already Arial 12pt)
+        document = Document(BytesIO(_BASE_DOCX_BYTES))
 
-        # Render sections
+        # Resolve every section first, then download all bodies in parallel
+        # (independent GETs); rendering below stays in template order
+        paths = []
         for section in template:
             for subsection in section.get("sections", []):
                 subheading = format_heading(subsection.get("subheading", ""))
                 s3_path = subsection.get("s3_path", "")
                 if not s3_path.startswith("s3://"):
                     s3_path = f"s3://cammi-devprod/{project_id}/gtm/{s3_path}"
-                content_text = read_text_file_from_s3(s3_path)
+                paths.append((subheading, s3_path))
 
-                # spacing before heading
-                document.add_paragraph()
+        contents = executor.map(read_text_file_from_s3, [s3_path for _, s3_path in paths])
 
-                # Heading
-                p = document.add_paragraph(style='Heading 1')
-                run = p.add_run(subheading)
-                apply_base_format(run, size=17, bold=True)
-                run.font.color.rgb = RGBColor(0, 0, 0)
+        # Render sections
+        for (subheading, _), (content_lines, is_sep) in zip(paths, contents):
+            # spacing before heading
+            document.add_paragraph()
 
-                # spacing after heading
-                document.add_paragraph()
+            # Heading
+            p = document.add_paragraph(style='Heading 1')
+            run = p.add_run(subheading)
+            apply_base_format(run, size=17, bold=True)
+            run.font.color.rgb = RGBColor(0, 0, 0)
+
+            # spacing after heading
+            document.add_paragraph()
 
-                # Content (auto tables + rich formatting)
-                add_formatted_paragraphs(document, content_text, template_h1=subheading)
+            # Content (auto tables + rich formatting)
+            add_formatted_paragraphs(document, content_lines, is_sep, template_h1=subheading)
 
         # Save to buffer
         buffer = BytesIO()
         document.save(buffer)
-        buffer.seek(0)
-
-        # Upload to S3
-        s3.put_object(
-            Bucket=output_bucket,
-            Key=output_key,
-            Body=buffer.getvalue(),
-            ContentType='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+        file_bytes = buffer.getvalue()
+
+        # Upload to S3 through the transfer manager. upload_fileobj closes the
+        # stream it is given, so it gets its own BytesIO over the same bytes
+        # (CPython shares the buffer; neither step copies the DOCX).
+        s3.upload_fileobj(
+            BytesIO(file_bytes), output_bucket, output_key,
+            ExtraArgs={
+                "ContentType": 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+            },
+            Config=UPLOAD_CONFIG
         )
 
         # Build document info
@@ -548,34 +696,33 @@ def lambda_handler(event, context):
             document_name=document_name,
             document_url=document_url
         )
-        
-        # Folder path for the user
-        FOLDER_PREFIX = f"project/{project_id}/{document_type}/marketing_strategy_document/"
-        
-        # List objects in S3 folder
-        response = s3.list_objects_v2(Bucket=output_bucket, Prefix=FOLDER_PREFIX)
-        
-        # Filter only .docx files
-        docx_files = [
-            obj for obj in response.get("Contents", [])
-            if obj["Key"].endswith(".docx")
-        ]
-        
-        if not docx_files:
+
+        save_latest_docx_pointer(project_id, document_type, output_key)
+
+        # The latest file is the one just written: hand out a pre-signed URL
+        # for it instead of listing the folder and downloading it again
+        if not file_bytes:
             return {
                 "statusCode": 404,
-                "body": json.dumps({"error": "No .docx files found in the folder"}),
+                "body": json.dumps({"error": "Generated .docx is empty"}),
                 "headers": CORS_HEADERS
             }
-        
-        # Get latest file
-        latest_file = max(docx_files, key=lambda x: x["LastModified"])
-        latest_key = latest_file["Key"]
-        
-        # Read and encode file
-        s3_response = s3.get_object(Bucket=output_bucket, Key=latest_key)
-        file_data = s3_response["Body"].read()
-        encoded_data = base64.b64encode(file_data).decode("utf-8")
+
+        latest_key = output_key
+        docx_url = s3.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": output_bucket, "Key": latest_key},
+            ExpiresIn=DOCX_URL_EXPIRES
+        )
+
+        response_body = {
+            "message": "Latest .docx file fetched successfully",
+            "fileName": latest_key.split("/")[-1],
+            "docxUrl": docx_url
+        }
+        # Small files are still inlined for clients that read docxBase64
+        if len(file_bytes) <= DOCX_INLINE_MAX_BYTES:
+            response_body["docxBase64"] = base64.b64encode(file_bytes).decode("utf-8")
 
         # Reset execution plan statuses
         # update_status_to_false(bucket_name='cammi-devprod', object_key=object_key)
@@ -584,11 +731,7 @@ def lambda_handler(event, context):
             "statusCode": 200,
             "session_id": session_id,
             "project_id": project_id,
-            "body": json.dumps({
-                "message": "Latest .docx file fetched successfully",
-                "fileName": latest_key.split("/")[-1],
-                "docxBase64": encoded_data
-            }),
+            "body": json.dumps(response_body),
             "headers": CORS_HEADERS
         }
     
@@ -1,7 +1,10 @@
 import json
 import os
+import time
+import hashlib
 import boto3
 import logging
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from boto3.dynamodb.conditions import Key
 
@@ -22,19 +25,46 @@ LLM_MODEL_ID = os.environ.get(
     "LLM_MODEL_ID",
     "anthropic.claude-3-sonnet-20240229-v1:0"
 )
+# Character budget for the KB context sent to the LLM (input dominates latency)
+MAX_CONTEXT_CHARS = int(os.environ.get("MAX_CONTEXT_CHARS", "12000"))
 
 # -------------------------------------------------
 # AWS Clients
 # -------------------------------------------------
-dynamodb = boto3.resource("dynamodb", region_name=REGION)
-bedrock_runtime = boto3.client("bedrock-runtime", region_name=REGION)
+# Keep-alive connections reused across calls and warm invocations
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    connect_timeout=2,
+    read_timeout=10
+)
+# LLM generation can run well past the default read timeout
+BEDROCK_CONFIG = BOTO_CONFIG.merge(Config(read_timeout=120))
+
+dynamodb = boto3.resource("dynamodb", region_name=REGION, config=BOTO_CONFIG)
+bedrock_runtime = boto3.client(
+    "bedrock-runtime",
+    region_name=REGION,
+    config=BEDROCK_CONFIG
+)
 bedrock_agent_runtime = boto3.client(
     "bedrock-agent-runtime",
-    region_name=REGION
+    region_name=REGION,
+    config=BEDROCK_CONFIG
 )
 
 campaign_table = dynamodb.Table(CAMPAIGN_TABLE)
 
+# -------------------------------------------------
+# KB Retrieval Cache
+# -------------------------------------------------
+# The retrieval prompt is fixed and scoped only by user_id, so warm containers
+# reuse the retrieved chunks for KB_CACHE_TTL seconds instead of calling
+# Bedrock retrieve again. Keyed by (user_id, sha256(query)).
+KB_CACHE_TTL = 300
+KB_CACHE_MAX_ENTRIES = 256
+_KB_CACHE = {}
+
 # -------------------------------------------------
 # API Gateway Response Helper (🔥 CRITICAL)
 # -------------------------------------------------
@@ -53,9 +83,26 @@ def api_response(status_code: int, body: dict):
 # -------------------------------------------------
 # Helpers
 # -------------------------------------------------
-def get_campaign_and_user(campaign_id: str) -> dict:
+# Only the attributes the handler reads
+CAMPAIGN_PROJECTION = (
+    "campaign_id, project_id, user_id, campaign_name, campaign_goal_type, platform_name"
+)
+
+
+def get_campaign_and_user(campaign_id: str, project_id: str = None) -> dict:
+    # Direct get_item when the full key is known, otherwise query by campaign_id
+    if project_id:
+        item = campaign_table.get_item(
+            Key={"campaign_id": campaign_id, "project_id": project_id},
+            ProjectionExpression=CAMPAIGN_PROJECTION
+        ).get("Item")
+        if not item:
+            raise ValueError("Campaign not found")
+        return item
+
     response = campaign_table.query(
         KeyConditionExpression=Key("campaign_id").eq(campaign_id),
+        ProjectionExpression=CAMPAIGN_PROJECTION,
         Limit=1
     )
     items = response.get("Items", [])
@@ -105,6 +152,42 @@ def extract_chunks_and_log_metadata(response: dict):
     ]
 
 
+def retrieve_chunks(user_id: str, query: str):
+    """User-filtered KB retrieval (falling back to unfiltered), cached per user and query."""
+    cache_key = (user_id, hashlib.sha256(query.encode("utf-8")).hexdigest())
+    cached = _KB_CACHE.get(cache_key)
+    if cached and cached[0] > time.time():
+        logger.info("KB cache hit | user_id=%s", user_id)
+        return cached[1]
+
+    chunks = extract_chunks_and_log_metadata(retrieve_with_filter(user_id, query))
+
+    if not chunks:
+        logger.warning("Filtered retrieval empty. Falling back.")
+        chunks = extract_chunks_and_log_metadata(retrieve_without_filter(query))
+
+    if chunks:
+        if len(_KB_CACHE) >= KB_CACHE_MAX_ENTRIES:
+            _KB_CACHE.clear()
+        _KB_CACHE[cache_key] = (time.time() + KB_CACHE_TTL, chunks)
+    return chunks
+
+
+def build_context(chunks) -> str:
+    """Drop duplicate chunks (keeping order) and stop at MAX_CONTEXT_CHARS."""
+    selected = []
+    total = 0
+    for chunk in dict.fromkeys(chunks):
+        if total + len(chunk) > MAX_CONTEXT_CHARS:
+            if not selected:
+                # never send an empty context: keep the top chunk, cut to budget
+                selected.append(chunk[:MAX_CONTEXT_CHARS])
+            break
+        selected.append(chunk)
+        total += len(chunk)
+    return "\n\n".join(selected)
+
+
 def call_llm(system_prompt: str, context: str) -> str:
     payload = {
         "anthropic_version": "bedrock-2023-05-31",
@@ -141,7 +224,7 @@ def lambda_handler(event, context):
             return api_response(400, {"message": "campaign_id is required"})
 
         # 1️⃣ Fetch Campaign
-        campaign = get_campaign_and_user(campaign_id)
+        campaign = get_campaign_and_user(campaign_id, body.get("project_id"))
         user_id = campaign["user_id"]
 
         logger.info("Campaign resolved | user_id=%s", user_id)
@@ -152,13 +235,7 @@ def lambda_handler(event, context):
             "content ideas, messaging, platform plan, CTA, and posting schedule."
         )
 
-        filtered_response = retrieve_with_filter(user_id, retrieval_prompt)
-        chunks = extract_chunks_and_log_metadata(filtered_response)
-
-        if not chunks:
-            logger.warning("Filtered retrieval empty. Falling back.")
-            unfiltered_response = retrieve_without_filter(retrieval_prompt)
-            chunks = extract_chunks_and_log_metadata(unfiltered_response)
+        chunks = retrieve_chunks(user_id, retrieval_prompt)
 
         if not chunks:
             return api_response(
@@ -166,7 +243,7 @@ def lambda_handler(event, context):
                 {"message": "Knowledge Base contains no retrievable content"}
             )
 
-        context_text = "\n\n".join(chunks)
+        context_text = build_context(chunks)
 
         # 3️⃣ System Prompt
         system_prompt = f"""
@@ -1,6 +1,6 @@
 import boto3
 import json
-from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.conditions import Key
  
 # DynamoDB client
 dynamodb = boto3.resource("dynamodb")
@@ -30,8 +30,12 @@ def lambda_handler(event, context):
         return {"statusCode": 400, "body": "session_id missing in input"}
  
     # Get connectionId from DynamoDB
-    response = users_table.scan(
-        FilterExpression=Attr("session_id").eq(session_id)
+    # session_id-index lookup instead of a full-table scan
+    response = users_table.query(
+        IndexName="session_id-index",
+        KeyConditionExpression=Key("session_id").eq(session_id),
+        ProjectionExpression="connection_id",
+        Limit=1
     )
  
     items = response.get("Items", [])